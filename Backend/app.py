@@ -1,27 +1,605 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, current_app, request, jsonify, Response, g, has_app_context, has_request_context, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import click
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+from collections import defaultdict, namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+import atexit
+import csv
+import glob
+import gzip
+import hashlib
+import io
+import mimetypes
+import posixpath
+import re
 import secrets
+import sqlite3
+import tempfile
 from datetime import datetime
+import json
 import logging
-from flask import send_from_directory
+import os
+import queue
+import threading
+import time
 
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*"}})
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///sports_system.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
 
-@app.route('/')
+
+def engine_options(uri):
+    options = {'pool_pre_ping': True}
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') == 'sqlite:'):
+        return options
+    
+    options['pool_size'] = int(os.environ.get('DB_POOL_SIZE', 10))
+    options['max_overflow'] = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    options['pool_timeout'] = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    options['pool_recycle'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    if uri.startswith('sqlite'):
+        # Connections are shared across request and writer threads through
+        # the pool; the busy timeout itself is set by the connect pragmas.
+        options['connect_args'] = {'check_same_thread': False}
+    return options
+
+def configure(app, overrides=None):
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///sports_system.db')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = None
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLITE_JOURNAL_MODE'] = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_BUSY_TIMEOUT_MS'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', 0))
+    app.config['SLOW_REQUEST_MAX_STATEMENTS'] = 50
+    app.config['WRITE_BEHIND'] = os.environ.get('WRITE_BEHIND', '0') == '1'
+    app.config['WRITE_BATCH_SIZE'] = int(os.environ.get('WRITE_BATCH_SIZE', 50))
+    app.config['WRITE_LINGER_MS'] = float(os.environ.get('WRITE_LINGER_MS', 5))
+    app.config['WRITE_TIMEOUT'] = float(os.environ.get('WRITE_TIMEOUT', 10))
+    app.config['TERM_CACHE_TTL'] = float(os.environ.get('TERM_CACHE_TTL', 5))
+    app.config['LIVE_SNAPSHOT_TTL'] = float(os.environ.get('LIVE_SNAPSHOT_TTL', 2))
+    app.config['LIVE_POLL_INTERVAL'] = float(os.environ.get('LIVE_POLL_INTERVAL', 1))
+    # Open /stream connections allowed per process, 0 for no limit. Under a
+    # threaded server each one holds a thread; see gunicorn.conf.py.
+    app.config['STREAM_LIMIT'] = int(os.environ.get('STREAM_LIMIT', 0))
+    # Directory the workers of one server share their metrics through, so any
+    # of them can answer /metrics for all; see gunicorn.conf.py.
+    app.config['METRICS_DIR'] = os.environ.get('METRICS_DIR', '')
+    app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+    app.config['SCHEDULER_ENABLED'] = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+    app.config['SCHEDULER_MAX_SLEEP'] = float(os.environ.get('SCHEDULER_MAX_SLEEP', 30))
+    app.config['MAX_PAGE_SIZE'] = 500
+    app.config['EXPORT_BATCH_SIZE'] = 500
+    app.config['IMPORT_BATCH_SIZE'] = 1000
+    app.config['FRONTEND_DIR'] = os.environ.get(
+        'FRONTEND_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Frontend'))
+    app.config['ASSET_RELOAD'] = os.environ.get('ASSET_RELOAD', '0') == '1'
+    app.config['ASSET_MAX_AGE'] = int(os.environ.get('ASSET_MAX_AGE', 31536000))
+    app.config['ARCHIVE_DIR'] = os.environ.get('ARCHIVE_DIR', os.path.join(app.instance_path, 'archive'))
+    app.config['ARCHIVE_KEEP_TERMS'] = int(os.environ.get('ARCHIVE_KEEP_TERMS', 2))
+    app.config['EMAIL_DOMAIN'] = os.environ.get('EMAIL_DOMAIN', 'stmarks.nsw.edu.au')
+    app.config['YEAR_LEVELS'] = os.environ.get('YEAR_LEVELS', '7,8,9,10').split(',')
+    app.config['TENANTS'] = {}
+    if os.environ.get('TENANTS_FILE'):
+        with open(os.environ['TENANTS_FILE']) as f:
+            app.config['TENANTS'] = json.load(f)
+    app.config.update(overrides or {})
+    if app.config['SQLALCHEMY_ENGINE_OPTIONS'] is None:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# orjson encodes the large admin lists several times faster than the standard
+# library. Anything it cannot encode natively goes through Flask's default
+# hook, so responses look the same whichever provider is active.
+class OrjsonProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# Each school is a tenant with its own email domain, year levels and database.
+# The default tenant is the app's own database, so a single-school deployment
+# needs no tenant configuration at all. Others come from TENANTS_FILE, e.g.
+#
+#   {"stmarks": {"hosts": ["sports.stmarks.nsw.edu.au"],
+#                "email_domain": "stmarks.nsw.edu.au",
+#                "year_levels": ["7", "8", "9", "10"],
+#                "database_url": "sqlite:////srv/sports/stmarks.db"}}
+#
+# and are picked by host name or by a /<slug>/ path prefix.
+Tenant = namedtuple('Tenant', ['slug', 'hosts', 'email_domain', 'year_levels', 'database_url'])
+
+class Tenants:
+    def __init__(self):
+        self.app = None
+        self.default = None
+        self.by_slug = {}
+        self.by_host = {}
+        self.engines = {}
+        self.lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.default = Tenant('default', (), app.config['EMAIL_DOMAIN'], tuple(app.config['YEAR_LEVELS']), None)
+        self.by_slug = {}
+        self.by_host = {}
+        with self.lock:
+            for engine in self.engines.values():
+                engine.dispose()
+            self.engines = {}
+        for slug, options in app.config['TENANTS'].items():
+            if not options.get('database_url'):
+                os.makedirs(app.instance_path, exist_ok=True)
+            tenant = Tenant(
+                slug,
+                tuple(host.lower() for host in options.get('hosts', ())),
+                options.get('email_domain', self.default.email_domain),
+                tuple(str(year) for year in options.get('year_levels', self.default.year_levels)),
+                options.get('database_url') or f"sqlite:///{os.path.join(app.instance_path, slug + '.db')}"
+            )
+            self.by_slug[slug] = tenant
+            for host in tenant.hosts:
+                self.by_host[host] = tenant
+        app.wsgi_app = TenantPrefixMiddleware(app.wsgi_app, self)
+
+    def all(self):
+        return [self.default] + list(self.by_slug.values())
+
+    def resolve(self, environ, host):
+        slug = environ.get('sports.tenant')
+        if slug:
+            return self.by_slug[slug]
+        return self.by_host.get(host.split(':')[0].lower(), self.default)
+
+    # Every tenant gets its own engine and pool, so a registration rush at one
+    # school queues on that school's write lock only.
+    def engine(self, tenant):
+        with self.lock:
+            if tenant.slug not in self.engines:
+                engine = create_engine(tenant.database_url, **engine_options(tenant.database_url))
+                if engine.dialect.name == 'sqlite':
+                    event.listen(engine, 'connect', sqlite_pragmas(self.app.config))
+                self.engines[tenant.slug] = engine
+            return self.engines[tenant.slug]
+
+class TenantPrefixMiddleware:
+    def __init__(self, wsgi_app, registry):
+        self.wsgi_app = wsgi_app
+        self.registry = registry
+
+    def __call__(self, environ, start_response):
+        slug, _, rest = environ.get('PATH_INFO', '').lstrip('/').partition('/')
+        if slug in self.registry.by_slug:
+            environ['sports.tenant'] = slug
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + '/' + slug
+            environ['PATH_INFO'] = '/' + rest
+        return self.wsgi_app(environ, start_response)
+
+tenants = Tenants()
+
+def current_tenant():
+    if has_app_context():
+        return g.get('tenant') or tenants.default
+    return tenants.default
+
+def tenant_slug():
+    return current_tenant().slug
+
+@contextmanager
+def use_tenant(tenant):
+    previous = g.get('tenant')
+    db.session.remove()
+    g.tenant = tenant
+    try:
+        yield tenant
+    finally:
+        db.session.remove()
+        g.tenant = previous
+
+class TenantSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            tenant = current_tenant()
+            if tenant is not None and tenant.database_url:
+                return tenants.engine(tenant)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': TenantSession})
+bp = Blueprint('sports', __name__, cli_group=None)
+
+@bp.before_app_request
+def resolve_tenant():
+    g.tenant = tenants.resolve(request.environ, request.host)
+
+# WAL lets readers keep going while the single writer commits, and
+# synchronous=NORMAL is safe under WAL while saving an fsync per commit.
+def sqlite_pragmas(config):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.close()
+    return set_sqlite_pragmas
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        self.counts = [a + b for a, b in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+# Each process keeps its own metrics. With METRICS_DIR set, every worker also
+# writes them to metrics-<pid>.json there every METRICS_FLUSH_INTERVAL seconds
+# and on exit, and /metrics adds up all the files, so whichever worker a
+# scrape reaches reports the whole server. Files of workers that have exited
+# are kept so counters never go backwards.
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.queries = defaultdict(lambda: Histogram(QUERY_BUCKETS))
+        self.db_seconds = defaultdict(float)
+        self.write_seconds = defaultdict(float)
+        self.responses = defaultdict(int)
+        self.startup_seconds = None
+        self.directory = None
+        self.flush_interval = 5
+        self.flushed_at = 0
+        self.pid = os.getpid()
+
+    def init_app(self, app):
+        if app.config['METRICS_DIR'] and not self.directory:
+            atexit.register(self.flush)
+        self.directory = app.config['METRICS_DIR'] or None
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL']
+        self.pid = os.getpid()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def record(self, route, method, status, elapsed, queries, db_seconds, write_seconds):
+        key = (route, method)
+        with self.lock:
+            self.latency[key].observe(elapsed)
+            self.queries[key].observe(queries)
+            self.db_seconds[key] += db_seconds
+            self.write_seconds[key] += write_seconds
+            self.responses[(route, method, status)] += 1
+        if self.directory and time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def state(self):
+        with self.lock:
+            return {
+                'pid': self.pid,
+                'startup_seconds': self.startup_seconds,
+                'latency': [[*key, h.counts, h.total, h.count] for key, h in self.latency.items()],
+                'queries': [[*key, h.counts, h.total, h.count] for key, h in self.queries.items()],
+                'db_seconds': [[*key, value] for key, value in self.db_seconds.items()],
+                'write_seconds': [[*key, value] for key, value in self.write_seconds.items()],
+                'responses': [[*key, count] for key, count in self.responses.items()],
+            }
+
+    def merge(self, state):
+        for route, method, counts, total, count in state['latency']:
+            self.latency[(route, method)].merge(counts, total, count)
+        for route, method, counts, total, count in state['queries']:
+            self.queries[(route, method)].merge(counts, total, count)
+        for route, method, value in state['db_seconds']:
+            self.db_seconds[(route, method)] += value
+        for route, method, value in state['write_seconds']:
+            self.write_seconds[(route, method)] += value
+        for route, method, status, count in state['responses']:
+            self.responses[(route, method, status)] += count
+
+    def flush(self):
+        if not self.directory:
+            return
+        self.flushed_at = time.monotonic()
+        path = os.path.join(self.directory, f'metrics-{self.pid}.json')
+        with self.flush_lock:
+            try:
+                with open(path + '.tmp', 'w') as f:
+                    json.dump(self.state(), f)
+                os.replace(path + '.tmp', path)
+            except OSError as e:
+                logger.error(f"Error writing metrics to {path}: {str(e)}")
+
+    def render(self):
+        if not self.directory:
+            return self.render_series({None: self.startup_seconds})
+        self.flush()
+        combined = Metrics()
+        startup = {}
+        for path in sorted(glob.glob(os.path.join(self.directory, 'metrics-*.json'))):
+            try:
+                with open(path) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            combined.merge(state)
+            startup[state['pid']] = state['startup_seconds']
+        return combined.render_series(startup)
+
+    def render_series(self, startup):
+        lines = []
+        if any(seconds is not None for seconds in startup.values()):
+            lines.append('# HELP sports_app_startup_seconds Time taken by create_app in each process.')
+            lines.append('# TYPE sports_app_startup_seconds gauge')
+            for pid, seconds in startup.items():
+                if seconds is not None:
+                    labels = f'{{pid="{pid}"}}' if pid is not None else ''
+                    lines.append(f'sports_app_startup_seconds{labels} {seconds}')
+        with self.lock:
+            self.render_histogram(lines, 'sports_request_duration_seconds', 'Request latency by route.', self.latency)
+            self.render_histogram(lines, 'sports_request_queries', 'SQL statements issued per request.', self.queries)
+            self.render_counter(lines, 'sports_request_db_seconds_total', 'Time spent executing SQL by route.', self.db_seconds)
+            self.render_counter(lines, 'sports_request_db_write_seconds_total',
+                                'Time spent in INSERT/UPDATE/DELETE by route, including waits for the SQLite write lock.',
+                                self.write_seconds)
+            lines.append('# HELP sports_responses_total Responses by route and status code.')
+            lines.append('# TYPE sports_responses_total counter')
+            for (route, method, status), count in sorted(self.responses.items()):
+                lines.append(f'sports_responses_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def render_histogram(self, lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for (route, method), histogram in sorted(histograms.items()):
+            labels = f'route="{route}",method="{method}"'
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{{labels}}} {histogram.total}')
+            lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+    def render_counter(self, lines, name, help_text, values):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (route, method), value in sorted(values.items()):
+            lines.append(f'{name}{{route="{route}",method="{method}"}} {value}')
+
+metrics = Metrics()
+
+# Counts the SQL statements run on any engine while active. Only statements
+# from the calling thread count unless all_threads is set, so the scheduler,
+# write queue and live poller don't leak into a request's count. Wrap
+# test-client calls or any other code to see what it costs:
+#
+#   with count_queries() as queries:
+#       client.delete(f'/delete-student/{student_id}')
+#   queries.assert_at_most(9, 'delete-student')
+class QueryCounter:
+    def __init__(self, thread=None):
+        self.thread = thread
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def record(self, statement, elapsed):
+        if self.thread is None or self.thread == threading.get_ident():
+            self.statements.append((elapsed * 1000, ' '.join(statement.split())))
+
+    def report(self):
+        return '\n'.join(f'  {ms:.1f}ms {sql}' for ms, sql in self.statements)
+
+    def assert_at_most(self, budget, label='block'):
+        if self.count > budget:
+            raise AssertionError(f"{label} ran {self.count} queries, budget is {budget}:\n{self.report()}")
+
+query_counters = []
+query_counters_lock = threading.Lock()
+
+@contextmanager
+def count_queries(all_threads=False):
+    counter = QueryCounter(None if all_threads else threading.get_ident())
+    with query_counters_lock:
+        query_counters.append(counter)
+    try:
+        yield counter
+    finally:
+        with query_counters_lock:
+            query_counters.remove(counter)
+
+@bp.before_app_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.query_count = 0
+    g.db_seconds = 0.0
+    g.write_seconds = 0.0
+    g.statements = [] if current_app.config['SLOW_REQUEST_MS'] else None
+
+@bp.after_app_request
+def record_request_metrics(response):
+    if 'request_start' not in g:
+        return response
+    
+    elapsed = time.perf_counter() - g.request_start
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.record(route, request.method, response.status_code, elapsed, g.query_count, g.db_seconds, g.write_seconds)
+    
+    slow_ms = current_app.config['SLOW_REQUEST_MS']
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        statements = '\n'.join(f'  {ms:.1f}ms {sql}' for ms, sql in g.statements)
+        logger.warning(f"Slow request {request.method} {request.path} took {elapsed * 1000:.1f}ms "
+                       f"({g.query_count} queries, {g.db_seconds * 1000:.1f}ms in database)\n{statements}")
+    return response
+
+# One start time per connection rather than a stack: after_cursor_execute does
+# not fire when a statement fails, so a pushed value would never be popped and
+# would outlive the request on the pooled connection.
+@event.listens_for(Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start']
+    if query_counters:
+        with query_counters_lock:
+            for counter in query_counters:
+                counter.record(statement, elapsed)
+    if not has_request_context() or 'query_count' not in g:
+        return
+    
+    g.query_count += 1
+    g.db_seconds += elapsed
+    if statement.lstrip()[:6].upper() in ('INSERT', 'UPDATE', 'DELETE'):
+        g.write_seconds += elapsed
+    if g.statements is not None and len(g.statements) < current_app.config['SLOW_REQUEST_MAX_STATEMENTS']:
+        g.statements.append((elapsed * 1000, ' '.join(statement.split())))
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+ASSET_REFERENCE = re.compile(r'(href|src)="([^"#?:]+)"')
+
+Asset = namedtuple('Asset', ['body', 'mimetype', 'digest', 'variants', 'immutable'])
+
+# The frontend is a handful of files, so the whole tree is read, fingerprinted
+# and compressed once per process and then served from memory. Pages are
+# rewritten to point at the fingerprinted names and always revalidate; the
+# fingerprinted files never change, so browsers can keep them for a year.
+class AssetCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.root = None
+        self.assets = None
+        self.fingerprints = {}
+        self.mtimes = {}
+
+    def get(self, path):
+        root = current_app.config['FRONTEND_DIR']
+        with self.lock:
+            if self.assets is None or self.root != root or (current_app.config['ASSET_RELOAD'] and self.changed()):
+                self.build(root)
+            return self.assets.get(path)
+
+    def changed(self):
+        try:
+            return any(os.path.getmtime(full) != mtime for full, mtime in self.mtimes.items())
+        except OSError:
+            return True
+
+    def build(self, root):
+        sources = {}
+        self.mtimes = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full = os.path.join(dirpath, filename)
+                with open(full, 'rb') as f:
+                    sources[os.path.relpath(full, root).replace(os.sep, '/')] = f.read()
+                self.mtimes[full] = os.path.getmtime(full)
+        
+        assets = {}
+        fingerprints = {}
+        for path, body in sources.items():
+            if path.endswith('.html'):
+                continue
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            base, ext = posixpath.splitext(path)
+            fingerprints[path] = f'{base}.{digest}{ext}'
+            assets[fingerprints[path]] = self.asset(path, body, digest, immutable=True)
+            assets[path] = assets[fingerprints[path]]._replace(immutable=False)
+        for path, body in sources.items():
+            if path.endswith('.html'):
+                body = self.rewrite(path, body, fingerprints)
+                assets[path] = self.asset(path, body, hashlib.sha256(body).hexdigest()[:12], immutable=False)
+        
+        self.root = root
+        self.assets = assets
+        self.fingerprints = fingerprints
+        logger.info(f"Built {len(sources)} static assets from {root}")
+
+    def rewrite(self, path, body, fingerprints):
+        directory = posixpath.dirname(path)
+        
+        def fingerprinted(match):
+            target = posixpath.normpath(posixpath.join(directory, match.group(2)))
+            if target not in fingerprints:
+                return match.group(0)
+            return f'{match.group(1)}="{posixpath.relpath(fingerprints[target], directory or ".")}"'
+        return ASSET_REFERENCE.sub(fingerprinted, body.decode('utf-8')).encode('utf-8')
+
+    def asset(self, path, body, digest, immutable):
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        variants = {}
+        if mimetype.startswith(COMPRESSIBLE_TYPES) and len(body) >= 512:
+            variants['gzip'] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli:
+                variants['br'] = brotli.compress(body, quality=11)
+        variants = {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+        return Asset(body, mimetype, digest, variants, immutable)
+
+    def send(self, asset):
+        encoding = next((e for e in ('br', 'gzip') if e in asset.variants and request.accept_encodings[e]), None)
+        response = Response(asset.variants[encoding] if encoding else asset.body, mimetype=asset.mimetype)
+        response.set_etag(f'{asset.digest}-{encoding}' if encoding else asset.digest)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        if asset.immutable:
+            response.headers['Cache-Control'] = f"public, max-age={current_app.config['ASSET_MAX_AGE']}, immutable"
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+asset_cache = AssetCache()
+
+@bp.route('/')
 def index():
-    return send_from_directory('Frontend', 'index.html')
+    return serve_static('index.html')
 
-@app.route('/<path:path>')
+@bp.route('/<path:path>')
 def serve_static(path):
-    return send_from_directory('Frontend', path)
+    asset = asset_cache.get(path)
+    if not asset:
+        return not_found(None)
+    return asset_cache.send(asset)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -30,16 +608,36 @@ class Term(db.Model):
     term_name = db.Column(db.String(50), nullable=False)
     year = db.Column(db.Integer, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
+    archived = db.Column(db.Boolean, default=False)
 
 class Student(db.Model):
+    __table_args__ = (
+        db.Index('ix_student_email_term', 'email', 'term_id', unique=True),
+        db.Index('ix_student_term_year', 'term_id', 'year'),
+        db.Index('ix_student_term_surname', 'term_id', 'surname_key'),
+        db.Index('ix_student_term_year_surname', 'term_id', 'year', 'surname_key'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(100), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(10), nullable=False)
     year = db.Column(db.String(2), nullable=False)
     term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False)
+    # Lower-cased last word of the name, so listings can sort by surname in SQL.
+    surname_key = db.Column(db.String(100), default='')
+
+# Years are stored as text, so the export's numeric year order needs an index
+# on the cast itself to be read straight off the index.
+db.Index('ix_student_export_order', Student.term_id, db.cast(Student.year, db.Integer), Student.surname_key, Student.name)
+
+def surname_key(name):
+    parts = name.split()
+    return parts[-1].lower() if parts else ''
 
 class Sport(db.Model):
+    __table_args__ = (
+        db.Index('ix_sport_term', 'term_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(500), default='')
@@ -49,47 +647,1106 @@ class Sport(db.Model):
     term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False)
 
 class StudentSport(db.Model):
+    __table_args__ = (
+        db.Index('ix_student_sport_student_sport', 'student_id', 'sport_id', unique=True),
+        db.Index('ix_student_sport_sport', 'sport_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     sport_id = db.Column(db.Integer, db.ForeignKey('sport.id'), nullable=False)
 
 class Waitlist(db.Model):
+    __table_args__ = (
+        db.Index('ix_waitlist_student', 'student_id', unique=True),
+        db.Index('ix_waitlist_has_sport', 'has_sport'),
+        db.Index('ix_waitlist_sport_timestamp', 'sport_id', 'timestamp'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=db.func.now())
     has_sport = db.Column(db.Boolean, default=False)
+    sport_id = db.Column(db.Integer, db.ForeignKey('sport.id'))
 
 class SystemStatus(db.Model):
+    __table_args__ = (
+        db.Index('ix_system_status_term', 'term_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     is_open = db.Column(db.Boolean, default=False)
     open_datetime = db.Column(db.String(50), default='')
+    close_datetime = db.Column(db.String(50), default='')
     term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False)
 
-with app.app_context():
+# Bumped by every write that changes a term's data; the row with term_id 0
+# versions the term list itself.
+class DataVersion(db.Model):
+    term_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class SchemaMigration(db.Model):
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, default=db.func.now())
+
+TERMS_VERSION = 0
+
+def bump_version(term_id):
+    bumped = DataVersion.query.filter_by(term_id=term_id).update(
+        {DataVersion.version: DataVersion.version + 1}, synchronize_session=False)
+    if not bumped:
+        db.session.add(DataVersion(term_id=term_id, version=1))
+
+def term_etag(term_id):
+    version = db.session.execute(db.select(DataVersion.version).filter_by(term_id=term_id)).scalar()
+    return f'{term_id}-{version or 0}'
+
+def not_modified(etag):
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    return None
+
+def tagged(payload, etag):
+    response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Snapshots are what a new stream starts from and what /live-state serves.
+# Publishes from this process replace them straight away; the TTL bounds how
+# long writes made by other worker processes can go unseen.
+class LiveUpdates:
+    def __init__(self, keepalive=15, max_pending=100, ttl=2, limit=0):
+        self.keepalive = keepalive
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.subscribers = defaultdict(dict)
+        self.snapshots = {}
+        self.active_terms = {}
+
+    # Channels are per tenant, since term ids repeat across school databases.
+    # Each subscriber records the term it asked for, or None to follow the
+    # active term. Returns None once this process holds `limit` streams.
+    def subscribe(self, term_id=None):
+        q = queue.Queue(maxsize=self.max_pending)
+        with self.lock:
+            if self.limit and sum(len(subscribers) for subscribers in self.subscribers.values()) >= self.limit:
+                return None
+            self.subscribers[tenant_slug()][q] = term_id
+        return q
+
+    def unsubscribe(self, q):
+        with self.lock:
+            for subscribers in self.subscribers.values():
+                subscribers.pop(q, None)
+
+    # Whether anyone on this tenant follows the active term, and which other
+    # terms are watched explicitly.
+    def watched(self):
+        with self.lock:
+            terms = set(self.subscribers.get(tenant_slug(), {}).values())
+        return None in terms, terms - {None}
+
+    # Records the active term seen by the poller; True if it differs from the
+    # last one this process knew about.
+    def active_term_changed(self, term_id):
+        with self.lock:
+            previous = self.active_terms.get(tenant_slug())
+            self.active_terms[tenant_slug()] = term_id
+        return previous is not None and previous != term_id
+
+    # Returns (data, None) for a fresh snapshot, or (None, generation) to pass
+    # to remember() once the caller has read the current state.
+    def snapshot(self, event, term_id):
+        with self.lock:
+            entry = self.snapshots.get((tenant_slug(), event, term_id))
+            if entry and entry[1] > time.monotonic():
+                return entry[0], None
+            return None, self.generation
+
+    # A publish since the caller's read means its data may already be older
+    # than the snapshot, so it is returned but not kept.
+    def remember(self, event, term_id, data, generation):
+        with self.lock:
+            if generation == self.generation:
+                self.snapshots[(tenant_slug(), event, term_id)] = (data, time.monotonic() + self.ttl)
+        return data
+
+    # For changes found by polling, which this process may already have
+    # published itself. Returns whether anything was sent.
+    def publish_if_changed(self, event, term_id, payload):
+        key = (tenant_slug(), event, term_id)
+        with self.lock:
+            entry = self.snapshots.get(key)
+            if entry and entry[0] == json.dumps(payload):
+                self.snapshots[key] = (entry[0], time.monotonic() + self.ttl)
+                return False
+        self.publish(event, term_id, payload)
+        return True
+
+    def publish(self, event, term_id, payload, remember=True):
+        data = json.dumps(payload)
+        channel = tenant_slug()
+        with self.lock:
+            self.generation += 1
+            if remember:
+                self.snapshots[(channel, event, term_id)] = (data, time.monotonic() + self.ttl)
+            if event == 'term':
+                self.active_terms[channel] = term_id
+            subscribers = list(self.subscribers[channel])
+        for q in subscribers:
+            try:
+                q.put_nowait((event, term_id, data))
+            except queue.Full:
+                # A stalled client must not hold up the write path; it will
+                # pick up the latest snapshot once it drains.
+                pass
+
+live_updates = LiveUpdates()
+
+# List endpoints select just the columns they return and zip the row tuples
+# into dicts, so no ORM entities are built or tracked in the identity map.
+SPORT_FIELDS = ('id', 'name', 'description', 'capacity', 'current_count', 'is_open')
+STUDENT_FIELDS = ('id', 'email', 'name', 'phone', 'year')
+
+def as_dicts(fields, rows):
+    return [dict(zip(fields, row)) for row in rows]
+
+def sports_payload(term_id):
+    rows = db.session.query(
+        Sport.id, Sport.name, db.func.coalesce(Sport.description, ''), Sport.capacity, Sport.current_count, Sport.is_open
+    ).filter(Sport.term_id == term_id).order_by(Sport.id).all()
+    return {'sports': as_dicts(SPORT_FIELDS, rows)}
+
+def status_payload(status):
+    if not status:
+        return {'is_open': False, 'open_datetime': '', 'close_datetime': ''}
+    return {'is_open': status.is_open, 'open_datetime': status.open_datetime or '', 'close_datetime': status.close_datetime or ''}
+
+def publish_sports(term_id):
     try:
-        db.create_all()
-        if Term.query.count() == 0:
-            current_term = Term(term_name='Term 1', year=2025, is_active=True)
-            db.session.add(current_term)
-            db.session.commit()
-            logger.info("Database initialized successfully")
+        live_updates.publish('sports', int(term_id), sports_payload(term_id))
+    except Exception as e:
+        logger.error(f"Error publishing sports update: {str(e)}")
+
+def publish_status(term_id, status=None):
+    try:
+        if status is None:
+            status = SystemStatus.query.filter_by(term_id=term_id).first()
+        live_updates.publish('status', int(term_id), status_payload(status))
     except Exception as e:
-        logger.error(f"Database initialization error: {str(e)}")
+        logger.error(f"Error publishing status update: {str(e)}")
+
+def live_snapshot(event, term_id):
+    data, generation = live_updates.snapshot(event, term_id)
+    if data is None:
+        if event == 'sports':
+            payload = sports_payload(term_id)
+        else:
+            payload = status_payload(SystemStatus.query.filter_by(term_id=term_id).first())
+        data = live_updates.remember(event, term_id, json.dumps(payload), generation)
+    return data
+
+# Writes made by other worker processes never reach this process's channels,
+# so while it holds open streams it polls the data versions, statuses and
+# active term they watch and republishes whatever changed. Each poll is three
+# small queries per tenant, however many streams are open.
+class LivePoller:
+    def __init__(self, interval=1):
+        self.app = None
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.thread = None
+        self.versions = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.interval = app.config['LIVE_POLL_INTERVAL']
+        self.versions = {}
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='live-poller', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            for tenant in tenants.all():
+                try:
+                    with self.app.app_context():
+                        g.tenant = tenant
+                        self.poll()
+                except Exception as e:
+                    logger.error(f"Error polling live updates for {tenant.slug}: {str(e)}")
+
+    def poll(self):
+        follows_active, terms = live_updates.watched()
+        if not follows_active and not terms:
+            return
+        
+        if follows_active:
+            active = db.session.execute(db.select(Term.id).filter_by(is_active=True)).scalar()
+            if active:
+                terms.add(active)
+                if live_updates.active_term_changed(active):
+                    term_cache.invalidate()
+                    live_updates.publish('term', active, {'term_id': active}, remember=False)
+        
+        versions = dict(db.session.query(DataVersion.term_id, DataVersion.version).filter(DataVersion.term_id.in_(terms)))
+        statuses = {status.term_id: status for status in SystemStatus.query.filter(SystemStatus.term_id.in_(terms))}
+        for term_id in terms:
+            key = (tenant_slug(), term_id)
+            if self.versions.get(key) != versions.get(term_id):
+                self.versions[key] = versions.get(term_id)
+                live_updates.publish_if_changed('sports', term_id, sports_payload(term_id))
+            if live_updates.publish_if_changed('status', term_id, status_payload(statuses.get(term_id))):
+                term_cache.invalidate()
+
+live_poller = LivePoller()
+
+def clean_student(data):
+    email = str(data.get('email') or '').strip().lower()
+    name = str(data.get('name') or '').strip()
+    phone = str(data.get('phone') or '').strip()
+    year = str(data.get('year') or '').strip()
+    
+    tenant = current_tenant()
+    if not email or not email.endswith('@' + tenant.email_domain):
+        return None, 'Invalid school email address'
+    
+    if not name or len(name) < 2:
+        return None, 'Name must be at least 2 characters'
+    
+    if not phone or len(phone) != 10 or not phone.isdigit() or phone[0] != '0':
+        return None, 'Phone must be 10 digits starting with 0'
+    
+    if not year or year not in tenant.year_levels:
+        return None, 'Invalid year level'
+    
+    return {'email': email, 'name': name, 'phone': phone, 'year': year}, None
+
+class RegistrationError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+# Raised when a unique index rejects a write that passed the checks, i.e. a
+# concurrent request won the race. The session must be rolled back.
+class RegistrationConflict(RegistrationError):
+    pass
+
+# Registration writes are expressed as operations that run against the
+# current session without committing and return (result, term_id), where
+# term_id names the term whose sport counts changed. Every check runs before
+# anything is written, so a RegistrationError leaves the session clean and
+# the operation can share a transaction with others.
+def register_student(email, name, phone, year, term_id):
+    existing = Student.query.filter_by(email=email, term_id=term_id).first()
+    if existing:
+        raise RegistrationError('Already registered this term')
+    
+    bump_version(term_id)
+    new_student = Student(email=email, name=name, phone=phone, year=year, term_id=term_id, surname_key=surname_key(name))
+    db.session.add(new_student)
+    try:
+        db.session.flush()
+    except IntegrityError:
+        raise RegistrationConflict('Already registered this term')
+    return new_student.id, None
+
+def claim_sport(student_id, sport_id):
+    student = db.session.get(Student, student_id)
+    if not student:
+        raise RegistrationError('Student not found', 404)
+    
+    existing = StudentSport.query.filter_by(student_id=student_id, sport_id=sport_id).first()
+    if existing:
+        raise RegistrationError('Already registered for this sport')
+    
+    # Claim the seat with a single conditional UPDATE so the capacity check
+    # happens inside the database and concurrent requests cannot oversubscribe.
+    claimed = Sport.query.filter(
+        Sport.id == sport_id,
+        Sport.is_open == True,
+        Sport.current_count < Sport.capacity
+    ).update({Sport.current_count: Sport.current_count + 1}, synchronize_session=False)
+    
+    if not claimed:
+        sport = db.session.query(Sport.is_open, Sport.current_count, Sport.capacity).filter(Sport.id == sport_id).first()
+        if not sport:
+            raise RegistrationError('Sport not found', 404)
+        if not sport.is_open and sport.current_count < sport.capacity:
+            raise RegistrationError('Sport is closed')
+        raise RegistrationError('Sport is now full')
+    
+    Waitlist.query.filter_by(student_id=student_id).update({'has_sport': True}, synchronize_session=False)
+    bump_version(student.term_id)
+    db.session.add(StudentSport(student_id=student_id, sport_id=sport_id))
+    try:
+        db.session.flush()
+    except IntegrityError:
+        raise RegistrationConflict('Already registered for this sport')
+    return None, student.term_id
+
+class WriteQueue:
+    def __init__(self, batch_size=50, linger=0.005):
+        self.app = None
+        self.batch_size = batch_size
+        self.linger = linger
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config['WRITE_BATCH_SIZE']
+        self.linger = app.config['WRITE_LINGER_MS'] / 1000
+
+    def submit(self, op, *args):
+        future = Future()
+        self.pending.put((op, args, future, current_tenant()))
+        self.start()
+        return future
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='write-queue', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            by_tenant = defaultdict(list)
+            for item in batch:
+                by_tenant[item[3]].append(item)
+            for tenant, items in by_tenant.items():
+                with self.app.app_context():
+                    g.tenant = tenant
+                    self.commit(items)
+
+    def commit(self, batch):
+        outcomes = []
+        changed_terms = set()
+        try:
+            for op, args, future, _ in batch:
+                try:
+                    result, term_id = op(*args)
+                    outcomes.append((future, result, None))
+                    if term_id:
+                        changed_terms.add(term_id)
+                except RegistrationConflict:
+                    raise
+                except RegistrationError as e:
+                    outcomes.append((future, None, e))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                if not isinstance(e, RegistrationConflict):
+                    logger.error(f"Error committing write: {str(e)}")
+                batch[0][2].set_exception(e)
+                return
+            # Retry one by one so a single bad write only fails its own request.
+            logger.warning(f"Group commit of {len(batch)} writes failed, retrying individually: {str(e)}")
+            for item in batch:
+                self.commit([item])
+            return
+        
+        for future, result, error in outcomes:
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        for term_id in changed_terms:
+            publish_sports(term_id)
+
+write_queue = WriteQueue()
+
+def run_write(op, *args):
+    if current_app.config['WRITE_BEHIND']:
+        return write_queue.submit(op, *args).result(timeout=current_app.config['WRITE_TIMEOUT'])
+    
+    result, term_id = op(*args)
+    db.session.commit()
+    if term_id:
+        publish_sports(term_id)
+    return result
+
+ActiveTerm = namedtuple('ActiveTerm', ['id', 'term_name', 'year'])
+CachedStatus = namedtuple('CachedStatus', ['is_open', 'open_datetime', 'close_datetime'])
+
+# The active term and its status are read on every poll but change rarely.
+# Writers in this process invalidate the cache; the TTL bounds how long other
+# worker processes can serve a stale value.
+class TermCache:
+    def __init__(self, ttl=5):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.terms = {}
+        self.statuses = {}
+
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.terms.clear()
+            self.statuses.clear()
+
+    def active_term(self):
+        key = tenant_slug()
+        with self.lock:
+            entry = self.terms.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            generation = self.generation
+        
+        term = Term.query.filter_by(is_active=True).first()
+        cached = ActiveTerm(term.id, term.term_name, term.year) if term else None
+        with self.lock:
+            if generation == self.generation:
+                self.terms[key] = (cached, time.monotonic() + self.ttl)
+        return cached
+
+    def status(self, term_id):
+        key = (tenant_slug(), term_id)
+        with self.lock:
+            entry = self.statuses.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            generation = self.generation
+        
+        status = SystemStatus.query.filter_by(term_id=term_id).first()
+        cached = None
+        if status:
+            cached = CachedStatus(status.is_open, status.open_datetime or '', status.close_datetime or '')
+        with self.lock:
+            if generation == self.generation:
+                self.statuses[key] = (cached, time.monotonic() + self.ttl)
+        return cached
+
+term_cache = TermCache()
+
+def active_term_id():
+    term = term_cache.active_term()
+    return term.id if term else None
+
+def parse_schedule(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid datetime format: {value}")
+        return None
+
+def run_due_schedules(now=None):
+    now = now or datetime.now()
+    rows = db.session.query(
+        SystemStatus.id, SystemStatus.term_id, SystemStatus.open_datetime, SystemStatus.close_datetime
+    ).filter(db.or_(SystemStatus.open_datetime != '', SystemStatus.close_datetime != '')).all()
+    
+    events = []
+    for status_id, term_id, open_datetime, close_datetime in rows:
+        for field, value, is_open in (('open_datetime', open_datetime, True), ('close_datetime', close_datetime, False)):
+            due = parse_schedule(value) if value else None
+            if due:
+                events.append((due, status_id, term_id, field, value, is_open))
+    
+    changed_terms = set()
+    next_due = None
+    for due, status_id, term_id, field, value, is_open in sorted(events, key=lambda e: e[0]):
+        if due > now:
+            next_due = next_due or due
+            continue
+        # Consuming the schedule in the same conditional UPDATE means it fires
+        # exactly once, even with several workers running a scheduler.
+        fired = SystemStatus.query.filter(
+            SystemStatus.id == status_id,
+            getattr(SystemStatus, field) == value
+        ).update({'is_open': is_open, field: ''}, synchronize_session=False)
+        if fired:
+            changed_terms.add(term_id)
+            logger.info(f"Scheduled {'open' if is_open else 'close'} applied for term {term_id}")
+    db.session.commit()
+    
+    if changed_terms:
+        term_cache.invalidate()
+        for term_id in changed_terms:
+            publish_status(term_id)
+    return next_due
+
+class Scheduler:
+    def __init__(self, max_sleep=30):
+        self.app = None
+        self.max_sleep = max_sleep
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.max_sleep = app.config['SCHEDULER_MAX_SLEEP']
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='scheduler', daemon=True)
+                self.thread.start()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            next_due = None
+            for tenant in tenants.all():
+                try:
+                    with self.app.app_context():
+                        g.tenant = tenant
+                        due = run_due_schedules()
+                    if due and (next_due is None or due < next_due):
+                        next_due = due
+                except Exception as e:
+                    logger.error(f"Error running schedules for {tenant.slug}: {str(e)}")
+            
+            delay = self.max_sleep
+            if next_due:
+                delay = max(0, min(delay, (next_due - datetime.now()).total_seconds()))
+            self.wakeup.wait(delay)
+            self.wakeup.clear()
+
+scheduler = Scheduler()
+
+# Seats that free up go to the oldest waitlist entries first. An entry with a
+# preferred sport only takes a seat in that sport; one without goes to whichever
+# open sport has the most room. Callers commit, so the promotion lands in the
+# same transaction as the change that freed the seats.
+def promote_waitlist(term_id):
+    free = {sport_id: capacity - current_count for sport_id, capacity, current_count in db.session.query(
+        Sport.id, Sport.capacity, Sport.current_count
+    ).filter(Sport.term_id == term_id, Sport.is_open == True, Sport.current_count < Sport.capacity)}
+    if not free:
+        return []
+    
+    candidates = db.session.query(Waitlist.id, Waitlist.student_id, Waitlist.sport_id).join(
+        Student, Student.id == Waitlist.student_id
+    ).filter(
+        Student.term_id == term_id,
+        Waitlist.has_sport == False,
+        db.or_(Waitlist.sport_id.is_(None), Waitlist.sport_id.in_(list(free))),
+        ~db.select(StudentSport.id).where(StudentSport.student_id == Waitlist.student_id).exists()
+    ).order_by(Waitlist.timestamp, Waitlist.id)
+    
+    assigned = defaultdict(list)
+    for entry_id, student_id, preferred in candidates:
+        sport_id = preferred or max(free, key=free.get)
+        if free[sport_id] <= 0:
+            continue
+        free[sport_id] -= 1
+        assigned[sport_id].append((entry_id, student_id))
+        if not any(free.values()):
+            break
+    
+    promoted = []
+    for sport_id, entries in assigned.items():
+        # Registrations may have taken seats since they were counted, in which
+        # case these students stay queued for the next pass.
+        claimed = Sport.query.filter(
+            Sport.id == sport_id,
+            Sport.current_count + len(entries) <= Sport.capacity
+        ).update({Sport.current_count: Sport.current_count + len(entries)}, synchronize_session=False)
+        if claimed:
+            promoted.extend((entry_id, student_id, sport_id) for entry_id, student_id in entries)
+    if not promoted:
+        return []
+    
+    db.session.execute(db.insert(StudentSport), [
+        {'student_id': student_id, 'sport_id': sport_id} for _, student_id, sport_id in promoted
+    ])
+    Waitlist.query.filter(Waitlist.id.in_([entry_id for entry_id, _, _ in promoted])).update(
+        {'has_sport': True}, synchronize_session=False)
+    bump_version(term_id)
+    logger.info(f"Promoted {len(promoted)} waitlisted student(s) in term {term_id}")
+    return [{'student_id': student_id, 'sport_id': sport_id} for _, student_id, sport_id in promoted]
+
+# Sport.current_count is kept by hand on every write path so seat claims stay a
+# single conditional UPDATE. This recomputes it from the registrations and
+# repairs any sport that has drifted.
+# Sets every drifted sport's count to its number of registrations in a single
+# statement, so a seat claimed while it runs is never overwritten.
+def repair_counts_statement(term_id=None):
+    registered = db.select(db.func.count(StudentSport.id)).where(StudentSport.sport_id == Sport.id).scalar_subquery()
+    stmt = db.update(Sport).where(Sport.current_count.is_distinct_from(registered)).values(current_count=registered)
+    if term_id:
+        stmt = stmt.where(Sport.term_id == term_id)
+    return stmt
+
+def reconcile_counts(term_id=None):
+    repaired = db.session.execute(
+        repair_counts_statement(term_id).returning(Sport.id, Sport.term_id, Sport.current_count)
+    ).all()
+    changed_terms = {sport_term_id for _, sport_term_id, _ in repaired}
+    for changed_term in changed_terms:
+        bump_version(changed_term)
+    db.session.commit()
+    
+    for sport_id, _, count in repaired:
+        logger.warning(f"Repaired count for sport {sport_id}: now {count}")
+    for changed_term in changed_terms:
+        publish_sports(changed_term)
+    return [{'sport_id': sport_id, 'term_id': sport_term_id, 'now': count}
+            for sport_id, sport_term_id, count in repaired]
+
+# Statistics only change when the term's data version does, so each result is
+# kept against the ETag it was computed for.
+term_stats_cache = {}
+
+def term_stats(term_id, etag):
+    key = (tenant_slug(), term_id)
+    cached = term_stats_cache.get(key)
+    if cached and cached[0] == etag:
+        return cached[1]
+    
+    totals = db.select(
+        db.func.coalesce(db.func.sum(Sport.capacity), 0).label('seats'),
+        db.func.coalesce(db.func.sum(Sport.current_count), 0).label('filled')
+    ).where(Sport.term_id == term_id).subquery()
+    by_year = db.select(
+        Student.year,
+        db.func.count(db.distinct(Student.id)).label('students'),
+        db.func.count(db.distinct(StudentSport.student_id)).label('registered'),
+        db.func.count(db.distinct(Waitlist.id)).label('waitlisted')
+    ).outerjoin(StudentSport, StudentSport.student_id == Student.id).outerjoin(
+        Waitlist, db.and_(Waitlist.student_id == Student.id, Waitlist.has_sport == False)
+    ).where(Student.term_id == term_id).group_by(Student.year).subquery()
+    # The sport totals always produce one row, so joining the per-year rows
+    # onto it keeps the whole view to a single query even for an empty term.
+    rows = db.session.execute(
+        db.select(totals.c.seats, totals.c.filled, by_year.c.year, by_year.c.students,
+                  by_year.c.registered, by_year.c.waitlisted)
+        .select_from(totals.outerjoin(by_year, db.true()))
+        .order_by(by_year.c.year)
+    ).all()
+    
+    seats, filled = rows[0].seats, rows[0].filled
+    years = [{'year': r.year, 'students': r.students, 'registered': r.registered, 'waitlisted': r.waitlisted}
+             for r in rows if r.year is not None]
+    stats = {
+        'term_id': term_id,
+        'students': sum(y['students'] for y in years),
+        'registered': sum(y['registered'] for y in years),
+        'waitlisted': sum(y['waitlisted'] for y in years),
+        'seats': seats,
+        'filled': filled,
+        'fill_rate': round(filled / seats, 4) if seats else 0,
+        'years': years
+    }
+    term_stats_cache[key] = (etag, stats)
+    return stats
+
+# Old terms are moved out of the live database into one SQLite file per term,
+# so current-term queries and backups stay proportional to recent data. The
+# Term row stays behind, flagged as archived, so the term is still listed and
+# its export reads from the archive file.
+ARCHIVED_MODELS = (Sport, Student, StudentSport, Waitlist, SystemStatus)
+
+class ArchiveError(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+archive_engines = {}
+archive_engines_lock = threading.Lock()
+
+def archive_path(term_id):
+    tenant = current_tenant()
+    directory = current_app.config['ARCHIVE_DIR']
+    if tenant.database_url:
+        directory = os.path.join(directory, tenant.slug)
+    return os.path.join(directory, f'term-{term_id}.db')
+
+def archive_engine(term_id):
+    path = archive_path(term_id)
+    with archive_engines_lock:
+        if path not in archive_engines:
+            archive_engines[path] = create_engine(f'sqlite:///{path}')
+        return archive_engines[path]
+
+def close_archive_engine(term_id):
+    with archive_engines_lock:
+        engine = archive_engines.pop(archive_path(term_id), None)
+    if engine:
+        engine.dispose()
+
+def term_filter(model, term_id):
+    if model in (StudentSport, Waitlist):
+        return model.student_id.in_(db.select(Student.id).where(Student.term_id == term_id))
+    return model.term_id == term_id
+
+def archive_term(term_id):
+    term = db.session.get(Term, term_id)
+    if not term:
+        raise ArchiveError('Term not found', 404)
+    if term.is_active:
+        raise ArchiveError('The active term cannot be archived')
+    if term.archived:
+        raise ArchiveError('Term is already archived')
+    
+    path = archive_path(term_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = path + '.tmp'
+    if os.path.exists(staging):
+        os.remove(staging)
+    
+    # Build the archive under a temporary name and only swap it into place
+    # once every row has been written.
+    copied = {}
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    engine = create_engine(f'sqlite:///{staging}')
+    try:
+        with engine.begin() as conn:
+            # The staging file is new, so there is nothing to check for.
+            db.metadata.create_all(conn, tables=[Term.__table__] + [m.__table__ for m in ARCHIVED_MODELS], checkfirst=False)
+            conn.execute(db.insert(Term.__table__), [{c.name: getattr(term, c.name) for c in Term.__table__.columns}])
+            for model in ARCHIVED_MODELS:
+                copied[model] = 0
+                stmt = db.select(model.__table__).where(term_filter(model, term_id)).execution_options(yield_per=batch_size)
+                for rows in db.session.execute(stmt).mappings().partitions():
+                    conn.execute(db.insert(model.__table__), [dict(row) for row in rows])
+                    copied[model] += len(rows)
+    finally:
+        engine.dispose()
+    os.replace(staging, path)
+    
+    # Dependent rows first. A row count that differs from what was copied
+    # means the term was written to in the meantime, so nothing is removed.
+    for model in (StudentSport, Waitlist, Student, Sport, SystemStatus):
+        deleted = db.session.execute(
+            db.delete(model).where(term_filter(model, term_id)).execution_options(synchronize_session=False)
+        ).rowcount
+        if deleted != copied[model]:
+            db.session.rollback()
+            close_archive_engine(term_id)
+            os.remove(path)
+            raise ArchiveError('Term changed while it was being archived, try again', 409)
+    term.archived = True
+    bump_version(term_id)
+    bump_version(TERMS_VERSION)
+    db.session.commit()
+    term_cache.invalidate()
+    logger.info(f"Archived term {term_id} to {path}: " + ', '.join(f'{m.__tablename__}={n}' for m, n in copied.items()))
+    return {m.__tablename__: n for m, n in copied.items()}
 
-@app.errorhandler(404)
+def restore_term(term_id):
+    term = db.session.get(Term, term_id)
+    if not term:
+        raise ArchiveError('Term not found', 404)
+    if not term.archived:
+        raise ArchiveError('Term is not archived')
+    path = archive_path(term_id)
+    if not os.path.exists(path):
+        raise ArchiveError('Archive file is missing', 404)
+    
+    with archive_engine(term_id).connect() as conn:
+        rows = {model: [dict(row) for row in conn.execute(db.select(model.__table__)).mappings()]
+                for model in ARCHIVED_MODELS}
+    
+    # Ids freed when the term was archived may since have been reused, so
+    # rows are inserted afresh and references remapped to the new ids.
+    def reinsert(model, records):
+        if not records:
+            return {}
+        new_ids = db.session.execute(
+            db.insert(model).returning(model.id, sort_by_parameter_order=True),
+            [{k: v for k, v in record.items() if k != 'id'} for record in records]
+        ).scalars().all()
+        return dict(zip((record['id'] for record in records), new_ids))
+    
+    sport_ids = reinsert(Sport, rows[Sport])
+    student_ids = reinsert(Student, rows[Student])
+    for record in rows[StudentSport]:
+        record.update(student_id=student_ids[record['student_id']], sport_id=sport_ids[record['sport_id']])
+    for record in rows[Waitlist]:
+        record.update(student_id=student_ids[record['student_id']], sport_id=sport_ids.get(record['sport_id']))
+    reinsert(StudentSport, rows[StudentSport])
+    reinsert(Waitlist, rows[Waitlist])
+    reinsert(SystemStatus, rows[SystemStatus])
+    term.archived = False
+    bump_version(term_id)
+    bump_version(TERMS_VERSION)
+    db.session.commit()
+    
+    close_archive_engine(term_id)
+    os.remove(path)
+    term_cache.invalidate()
+    logger.info(f"Restored term {term_id} from {path}")
+    return {model.__tablename__: len(records) for model, records in rows.items()}
+
+def archive_old_terms(keep):
+    terms = Term.query.filter(Term.is_active == False, Term.archived == False).order_by(
+        Term.year.desc(), Term.id.desc()).all()
+    return {term.id: archive_term(term.id) for term in terms[keep:]}
+
+# db.create_all() only creates missing tables, so changes to existing tables
+# are applied here. Each migration runs once, in its own transaction, and must
+# also be a no-op on a database freshly built from the current models.
+MIGRATIONS = []
+
+def migration(version, name):
+    def register(upgrade):
+        MIGRATIONS.append((version, name, upgrade))
+        return upgrade
+    return register
+
+# IF NOT EXISTS rather than checkfirst, since reflection skips expression
+# indexes such as ix_student_export_order.
+def create_indexes(conn, *names):
+    indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    for name in names:
+        conn.execute(CreateIndex(indexes[name], if_not_exists=True))
+
+def add_column(conn, model, name):
+    table = model.__table__
+    if name in {c['name'] for c in db.inspect(conn).get_columns(table.name)}:
+        return
+    column = table.c[name]
+    conn.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(conn.dialect)}'))
+
+@migration(1, 'lookup indexes and uniqueness constraints')
+def add_lookup_indexes(conn):
+    # Races before the unique indexes existed could leave duplicate rows. A
+    # student registered twice in a term keeps the first row, and the later
+    # rows' sports and waitlist entries move onto it.
+    keepers = db.select(
+        Student.email, Student.term_id, db.func.min(Student.id).label('keep')
+    ).group_by(Student.email, Student.term_id).having(db.func.count(Student.id) > 1).subquery()
+    duplicates = conn.execute(db.select(Student.id, keepers.c.keep).join(
+        keepers, db.and_(Student.email == keepers.c.email, Student.term_id == keepers.c.term_id)
+    ).where(Student.id != keepers.c.keep)).all()
+    other_sport, other_waitlist = db.aliased(StudentSport), db.aliased(Waitlist)
+    for duplicate, keep in duplicates:
+        conn.execute(db.delete(StudentSport).where(
+            StudentSport.student_id == duplicate,
+            StudentSport.sport_id.in_(db.select(other_sport.sport_id).where(other_sport.student_id == keep))))
+        conn.execute(db.update(StudentSport).where(StudentSport.student_id == duplicate).values(student_id=keep))
+        conn.execute(db.delete(Waitlist).where(
+            Waitlist.student_id == duplicate,
+            db.select(other_waitlist.id).where(other_waitlist.student_id == keep).exists()))
+        conn.execute(db.update(Waitlist).where(Waitlist.student_id == duplicate).values(student_id=keep))
+        conn.execute(db.delete(Student).where(Student.id == duplicate))
+    if duplicates:
+        logger.warning(f"Merged {len(duplicates)} duplicate student registration(s)")
+    conn.execute(db.delete(StudentSport).where(StudentSport.id.not_in(
+        db.select(db.func.min(other_sport.id)).group_by(other_sport.student_id, other_sport.sport_id))))
+    conn.execute(db.delete(Waitlist).where(Waitlist.id.not_in(
+        db.select(db.func.min(other_waitlist.id)).group_by(other_waitlist.student_id))))
+    if duplicates:
+        conn.execute(db.update(Waitlist).where(
+            Waitlist.student_id.in_(db.select(StudentSport.student_id))).values(has_sport=db.true()))
+    conn.execute(repair_counts_statement())
+    create_indexes(conn, 'ix_student_email_term', 'ix_student_term_year', 'ix_sport_term',
+                   'ix_student_sport_student_sport', 'ix_student_sport_sport',
+                   'ix_waitlist_student', 'ix_waitlist_has_sport', 'ix_system_status_term')
+
+@migration(2, 'student surname sort key')
+def add_student_surname_key(conn):
+    add_column(conn, Student, 'surname_key')
+    rows = conn.execute(db.select(Student.id, Student.name).where(
+        db.or_(Student.surname_key.is_(None), Student.surname_key == ''))).all()
+    if rows:
+        conn.execute(
+            db.update(Student).where(Student.id == db.bindparam('student_id')).values(surname_key=db.bindparam('key')),
+            [{'student_id': student_id, 'key': surname_key(name)} for student_id, name in rows]
+        )
+    create_indexes(conn, 'ix_student_term_year_surname')
+
+@migration(3, 'scheduled close time')
+def add_close_datetime(conn):
+    add_column(conn, SystemStatus, 'close_datetime')
+    conn.execute(db.update(SystemStatus).where(SystemStatus.close_datetime.is_(None)).values(close_datetime=''))
+
+@migration(4, 'waitlist sport preference')
+def add_waitlist_sport(conn):
+    add_column(conn, Waitlist, 'sport_id')
+    create_indexes(conn, 'ix_waitlist_sport_timestamp')
+
+@migration(5, 'archived terms')
+def add_term_archived(conn):
+    add_column(conn, Term, 'archived')
+    conn.execute(db.update(Term).where(Term.archived.is_(None)).values(archived=False))
+
+@migration(6, 'student listing order index')
+def add_student_surname_index(conn):
+    conn.execute(db.update(Student).where(Student.surname_key.is_(None)).values(surname_key=''))
+    create_indexes(conn, 'ix_student_term_surname')
+
+@migration(7, 'student export order index')
+def add_student_export_index(conn):
+    create_indexes(conn, 'ix_student_export_order')
+
+def run_migrations(engine=None):
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        applied = set(conn.execute(db.select(SchemaMigration.version)).scalars())
+    
+    for version, name, upgrade in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(db.insert(SchemaMigration).values(version=version, name=name))
+        logger.info(f"Applied migration {version}: {name}")
+
+def init_db():
+    db.create_all()
+    run_migrations()
+    for tenant in tenants.all():
+        if tenant.database_url:
+            engine = tenants.engine(tenant)
+            db.metadata.create_all(engine)
+            run_migrations(engine)
+
+def seed_db():
+    for tenant in tenants.all():
+        with use_tenant(tenant):
+            if Term.query.count() == 0:
+                current_term = Term(term_name='Term 1', year=2025, is_active=True)
+                db.session.add(current_term)
+                db.session.commit()
+                logger.info(f"Database initialized successfully for {tenant.slug}")
+
+@bp.cli.command('init-db')
+def init_db_command():
+    """Create missing tables and apply pending migrations."""
+    init_db()
+
+@bp.cli.command('seed')
+def seed_command():
+    """Create the first term if the database has none."""
+    seed_db()
+
+@bp.cli.command('reconcile-counts')
+def reconcile_counts_command():
+    """Recompute every sport's registration count and repair drift."""
+    for tenant in tenants.all():
+        with use_tenant(tenant):
+            repaired = reconcile_counts()
+        print(f"{tenant.slug}: repaired {len(repaired)} sport(s)")
+
+@bp.cli.command('build-assets')
+@click.option('--output', default='dist', help='Directory to write the built assets to.')
+def build_assets_command(output):
+    """Write fingerprinted, precompressed assets for a front-end web server."""
+    asset_cache.build(current_app.config['FRONTEND_DIR'])
+    os.makedirs(output, exist_ok=True)
+    suffixes = {'gzip': '.gz', 'br': '.br'}
+    for path, asset in asset_cache.assets.items():
+        target = os.path.join(output, *path.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(asset.body)
+        for encoding, data in asset.variants.items():
+            with open(target + suffixes[encoding], 'wb') as f:
+                f.write(data)
+    with open(os.path.join(output, 'manifest.json'), 'w') as f:
+        json.dump(asset_cache.fingerprints, f, indent=2, sort_keys=True)
+    print(f"Wrote {len(asset_cache.assets)} assets to {output}")
+
+@bp.cli.command('archive-terms')
+@click.option('--keep', type=int, default=None, help='Number of recent inactive terms to keep live.')
+@click.option('--vacuum', is_flag=True, help='Compact the live SQLite database afterwards.')
+def archive_terms_command(keep, vacuum):
+    """Move old inactive terms into per-term archive databases."""
+    for tenant in tenants.all():
+        with use_tenant(tenant):
+            archived = archive_old_terms(current_app.config['ARCHIVE_KEEP_TERMS'] if keep is None else keep)
+            engine = db.session.get_bind()
+        for term_id, counts in archived.items():
+            print(f"{tenant.slug}: archived term {term_id}: {counts}")
+        if vacuum and engine.dialect.name == 'sqlite':
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(db.text('VACUUM'))
+
+@bp.cli.command('restore-term')
+@click.argument('term_id', type=int)
+@click.option('--tenant', 'slug', default='default', help='Tenant the term belongs to.')
+def restore_term_command(term_id, slug):
+    """Move an archived term back into the live database."""
+    tenant = tenants.default if slug == 'default' else tenants.by_slug[slug]
+    with use_tenant(tenant):
+        print(f"Restored term {term_id}: {restore_term(term_id)}")
+
+@bp.cli.command('run-scheduler')
+def run_scheduler():
+    """Run the open/close scheduler in the foreground."""
+    scheduler.run()
+
+# Building an app does no schema work, so pre-forked workers start quickly and
+# never race each other on DDL. Run `flask init-db` and `flask seed` once per
+# deploy instead. Nor does it start the scheduler: the serving entry points
+# (wsgi.py and __main__) do, so CLI commands never run a second loop.
+def create_app(config=None):
+    started = time.perf_counter()
+    app = Flask(__name__)
+    configure(app, config)
+    if orjson:
+        app.json = OrjsonProvider(app)
+    CORS(app, resources={r"/*": {"origins": "*"}}, expose_headers=['ETag'], max_age=600)
+    db.init_app(app)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', sqlite_pragmas(app.config))
+    app.register_blueprint(bp)
+    tenants.init_app(app)
+    
+    term_cache.ttl = app.config['TERM_CACHE_TTL']
+    live_updates.ttl = app.config['LIVE_SNAPSHOT_TTL']
+    live_updates.limit = app.config['STREAM_LIMIT']
+    live_poller.init_app(app)
+    write_queue.init_app(app)
+    metrics.init_app(app)
+    scheduler.init_app(app)
+    
+    app.config['STARTUP_SECONDS'] = metrics.startup_seconds = time.perf_counter() - started
+    logger.info(f"App created in {app.config['STARTUP_SECONDS'] * 1000:.1f}ms (pid {os.getpid()})")
+    return app
+
+@bp.app_errorhandler(404)
 def not_found(error):
     return jsonify({'status': 'error', 'message': 'Endpoint not found'}), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(500)
 def internal_error(error):
     db.session.rollback()
     logger.error(f"Internal server error: {str(error)}")
     return jsonify({'status': 'error', 'message': 'Server error occurred'}), 500
 
-@app.route('/get-current-term', methods=['GET'])
+@bp.route('/get-tenant-config', methods=['GET'])
+def get_tenant_config():
+    tenant = current_tenant()
+    return jsonify({'tenant': tenant.slug, 'email_domain': tenant.email_domain, 'year_levels': list(tenant.year_levels)}), 200
+
+@bp.route('/get-current-term', methods=['GET'])
 def get_current_term():
     try:
-        term = Term.query.filter_by(is_active=True).first()
+        term = term_cache.active_term()
         if not term:
             term = Term.query.order_by(Term.id.desc()).first()
         
@@ -101,17 +1758,23 @@ def get_current_term():
         logger.error(f"Error fetching current term: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching current term'}), 500
 
-@app.route('/get-all-terms', methods=['GET'])
+@bp.route('/get-all-terms', methods=['GET'])
 def get_all_terms():
     try:
+        etag = term_etag(TERMS_VERSION)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         terms = Term.query.order_by(Term.year.desc(), Term.id.desc()).all()
-        terms_list = [{'id': t.id, 'term_name': t.term_name, 'year': t.year, 'is_active': t.is_active} for t in terms]
-        return jsonify({'terms': terms_list}), 200
+        terms_list = [{'id': t.id, 'term_name': t.term_name, 'year': t.year, 'is_active': t.is_active, 'archived': bool(t.archived)}
+                      for t in terms]
+        return tagged({'terms': terms_list}, etag), 200
     except Exception as e:
         logger.error(f"Error fetching all terms: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching terms'}), 500
 
-@app.route('/create-term', methods=['POST', 'OPTIONS'])
+@bp.route('/create-term', methods=['POST', 'OPTIONS'])
 def create_term():
     if request.method == "OPTIONS":
         return '', 200
@@ -134,14 +1797,16 @@ def create_term():
         
         new_term = Term(term_name=term_name, year=year, is_active=False)
         db.session.add(new_term)
+        bump_version(TERMS_VERSION)
         db.session.commit()
+        term_cache.invalidate()
         return jsonify({'status': 'success', 'message': 'Term created', 'term_id': new_term.id}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error creating term: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error creating term'}), 500
 
-@app.route('/set-active-term/<int:term_id>', methods=['POST', 'OPTIONS'])
+@bp.route('/set-active-term/<int:term_id>', methods=['POST', 'OPTIONS'])
 def set_active_term(term_id):
     if request.method == "OPTIONS":
         return '', 200
@@ -150,17 +1815,54 @@ def set_active_term(term_id):
         term = Term.query.get(term_id)
         if not term:
             return jsonify({'status': 'error', 'message': 'Term not found'}), 404
+        if term.archived:
+            return jsonify({'status': 'error', 'message': 'Restore the term before activating it'}), 400
         
         Term.query.update({'is_active': False})
         term.is_active = True
+        bump_version(TERMS_VERSION)
         db.session.commit()
+        term_cache.invalidate()
+        live_updates.publish('term', term_id, {'term_id': term_id}, remember=False)
+        publish_status(term_id)
+        publish_sports(term_id)
         return jsonify({'status': 'success', 'message': 'Term activated'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error setting active term: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error setting active term'}), 500
 
-@app.route('/submit-form', methods=['POST', 'OPTIONS'])
+@bp.route('/archive-term/<int:term_id>', methods=['POST', 'OPTIONS'])
+def archive_term_route(term_id):
+    if request.method == "OPTIONS":
+        return '', 200
+    
+    try:
+        counts = archive_term(term_id)
+        return jsonify({'status': 'success', 'message': 'Term archived', 'rows': counts}), 200
+    except ArchiveError as e:
+        return jsonify({'status': 'error', 'message': e.message}), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error archiving term: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error archiving term'}), 500
+
+@bp.route('/restore-term/<int:term_id>', methods=['POST', 'OPTIONS'])
+def restore_term_route(term_id):
+    if request.method == "OPTIONS":
+        return '', 200
+    
+    try:
+        counts = restore_term(term_id)
+        return jsonify({'status': 'success', 'message': 'Term restored', 'rows': counts}), 200
+    except ArchiveError as e:
+        return jsonify({'status': 'error', 'message': e.message}), e.status_code
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error restoring term: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error restoring term'}), 500
+
+@bp.route('/submit-form', methods=['POST', 'OPTIONS'])
 def submit_form():
     if request.method == "OPTIONS":
         return '', 200
@@ -170,66 +1872,46 @@ def submit_form():
         if not data:
             return jsonify({'status': 'error', 'message': 'No data provided'}), 400
         
-        email = data.get('email', '').strip().lower()
-        name = data.get('name', '').strip()
-        phone = data.get('phone', '').strip()
-        year = data.get('year', '').strip()
-        
-        if not email or not email.endswith('@stmarks.nsw.edu.au'):
-            return jsonify({'status': 'error', 'message': 'Invalid school email address'}), 400
-        
-        if not name or len(name) < 2:
-            return jsonify({'status': 'error', 'message': 'Name must be at least 2 characters'}), 400
+        student, error = clean_student(data)
+        if error:
+            return jsonify({'status': 'error', 'message': error}), 400
         
-        if not phone or len(phone) != 10 or not phone.isdigit() or phone[0] != '0':
-            return jsonify({'status': 'error', 'message': 'Phone must be 10 digits starting with 0'}), 400
-        
-        if not year or year not in ['7', '8', '9', '10']:
-            return jsonify({'status': 'error', 'message': 'Invalid year level'}), 400
-        
-        current_term = Term.query.filter_by(is_active=True).first()
+        current_term = term_cache.active_term()
         if not current_term:
             return jsonify({'status': 'error', 'message': 'No active term'}), 400
         
-        existing = Student.query.filter_by(email=email, term_id=current_term.id).first()
-        if existing:
-            return jsonify({'status': 'error', 'message': 'Already registered this term'}), 400
-        
-        new_student = Student(email=email, name=name, phone=phone, year=year, term_id=current_term.id)
-        db.session.add(new_student)
-        db.session.commit()
-        return jsonify({'status': 'success', 'message': 'Contact info saved', 'student_id': new_student.id}), 200
+        try:
+            student_id = run_write(register_student, student['email'], student['name'], student['phone'], student['year'], current_term.id)
+        except RegistrationError as e:
+            db.session.rollback()
+            return jsonify({'status': 'error', 'message': e.message}), e.status_code
+        return jsonify({'status': 'success', 'message': 'Contact info saved', 'student_id': student_id}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error submitting form: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error saving data'}), 500
 
-@app.route('/get-sports', methods=['GET'])
+@bp.route('/get-sports', methods=['GET'])
 def get_sports():
     try:
-        term_id = request.args.get('term_id')
+        term_id = request.args.get('term_id', type=int)
         if not term_id:
-            current_term = Term.query.filter_by(is_active=True).first()
-            term_id = current_term.id if current_term else None
+            term_id = active_term_id()
         
         if not term_id:
             return jsonify({'status': 'error', 'message': 'No term specified'}), 400
         
-        sports = Sport.query.filter_by(term_id=term_id).all()
-        sports_list = [{
-            'id': s.id,
-            'name': s.name,
-            'description': s.description or '',
-            'capacity': s.capacity,
-            'current_count': s.current_count,
-            'is_open': s.is_open
-        } for s in sports]
-        return jsonify({'sports': sports_list}), 200
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        return tagged(sports_payload(term_id), etag), 200
     except Exception as e:
         logger.error(f"Error fetching sports: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching sports'}), 500
 
-@app.route('/submit-sport', methods=['POST', 'OPTIONS'])
+@bp.route('/submit-sport', methods=['POST', 'OPTIONS'])
 def submit_sport():
     if request.method == "OPTIONS":
         return '', 200
@@ -245,116 +1927,386 @@ def submit_sport():
         if not student_id or not sport_id:
             return jsonify({'status': 'error', 'message': 'Student and sport required'}), 400
         
-        student = Student.query.get(student_id)
-        if not student:
-            return jsonify({'status': 'error', 'message': 'Student not found'}), 404
-        
-        sport = Sport.query.get(sport_id)
-        if not sport:
-            return jsonify({'status': 'error', 'message': 'Sport not found'}), 404
-        
-        if sport.current_count >= sport.capacity:
-            return jsonify({'status': 'error', 'message': 'Sport is now full'}), 400
-        
-        if not sport.is_open:
-            return jsonify({'status': 'error', 'message': 'Sport is closed'}), 400
-        
-        existing = StudentSport.query.filter_by(student_id=student_id, sport_id=sport_id).first()
-        if existing:
-            return jsonify({'status': 'error', 'message': 'Already registered for this sport'}), 400
-        
-        sport_selection = StudentSport(student_id=student_id, sport_id=sport_id)
-        sport.current_count += 1
-        db.session.add(sport_selection)
-        
-        waitlist_entry = Waitlist.query.filter_by(student_id=student_id).first()
-        if waitlist_entry:
-            waitlist_entry.has_sport = True
-        
-        db.session.commit()
+        try:
+            run_write(claim_sport, student_id, sport_id)
+        except RegistrationError as e:
+            db.session.rollback()
+            return jsonify({'status': 'error', 'message': e.message}), e.status_code
         return jsonify({'status': 'success', 'message': 'Sport submitted'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error submitting sport: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error submitting sport'}), 500
 
-@app.route('/get-all-data', methods=['GET'])
+@bp.route('/get-all-data', methods=['GET'])
 def get_all_data():
     try:
-        term_id = request.args.get('term_id')
+        term_id = request.args.get('term_id', type=int)
         if not term_id:
-            current_term = Term.query.filter_by(is_active=True).first()
-            term_id = current_term.id if current_term else None
+            term_id = active_term_id()
         
         if not term_id:
             return jsonify({'status': 'error', 'message': 'No term specified'}), 400
         
-        students = Student.query.filter_by(term_id=term_id).all()
-        student_list = [{'id': s.id, 'email': s.email, 'name': s.name, 'phone': s.phone, 'year': s.year} for s in students]
-        return jsonify({'students': student_list}), 200
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        year = request.args.get('year', '').strip()
+        sport_id = request.args.get('sport_id', type=int)
+        search = request.args.get('search', '').strip()
+        limit = request.args.get('limit', type=int)
+        after = request.args.get('after', '')
+        if after:
+            after_key, _, after_id = after.rpartition(':')
+            if not after_id.isdigit():
+                return jsonify({'status': 'error', 'message': 'Invalid cursor'}), 400
+        
+        query = db.session.query(Student.id, Student.email, Student.name, Student.phone, Student.year).filter(
+            Student.term_id == term_id)
+        if year:
+            query = query.filter(Student.year == year)
+        if sport_id:
+            query = query.join(StudentSport, StudentSport.student_id == Student.id).filter(StudentSport.sport_id == sport_id)
+        if search:
+            query = query.filter(db.or_(
+                Student.name.icontains(search, autoescape=True),
+                Student.email.icontains(search, autoescape=True)
+            ))
+        
+        total = query.count()
+        
+        # Keyset pagination in surname order: the cursor is the last row's
+        # "surname_key:id", and each page starts after it, so deep pages cost
+        # the same as the first and pages never interleave.
+        query = query.add_columns(Student.surname_key).order_by(Student.surname_key, Student.id)
+        if after:
+            query = query.filter(db.tuple_(Student.surname_key, Student.id) > (after_key, int(after_id)))
+        next_cursor = None
+        if limit:
+            limit = max(1, min(limit, current_app.config['MAX_PAGE_SIZE']))
+            students = query.limit(limit + 1).all()
+            if len(students) > limit:
+                students = students[:limit]
+                next_cursor = f'{students[-1].surname_key}:{students[-1].id}'
+        else:
+            students = query.all()
+        
+        return tagged({'students': as_dicts(STUDENT_FIELDS, students), 'total': total, 'next_cursor': next_cursor}, etag), 200
     except Exception as e:
         logger.error(f"Error fetching all data: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching data'}), 500
 
-@app.route('/get-sport-registrations/<int:sport_id>', methods=['GET'])
+@bp.route('/get-sport-registrations/<int:sport_id>', methods=['GET'])
 def get_sport_registrations(sport_id):
     try:
-        sport = Sport.query.get(sport_id)
-        if not sport:
+        term_id = db.session.execute(db.select(Sport.term_id).filter_by(id=sport_id)).scalar()
+        if not term_id:
             return jsonify({'status': 'error', 'message': 'Sport not found'}), 404
         
-        registrations = db.session.query(Student, StudentSport).join(StudentSport).filter(StudentSport.sport_id == sport_id).all()
-        student_list = [{'id': s.id, 'name': s.name, 'email': s.email, 'year': s.year} for s, _ in registrations]
-        return jsonify({'students': student_list}), 200
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        rows = db.session.query(Student.id, Student.email, Student.name, Student.phone, Student.year).join(
+            StudentSport, StudentSport.student_id == Student.id
+        ).filter(StudentSport.sport_id == sport_id).order_by(StudentSport.id).all()
+        return tagged({'students': as_dicts(STUDENT_FIELDS, rows)}, etag), 200
     except Exception as e:
         logger.error(f"Error fetching sport registrations: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching registrations'}), 500
 
-@app.route('/delete-student/<int:student_id>', methods=['DELETE'])
+@bp.route('/get-registrations', methods=['GET'])
+def get_registrations():
+    try:
+        term_id = request.args.get('term_id', type=int)
+        if not term_id:
+            term_id = active_term_id()
+        
+        if not term_id:
+            return jsonify({'status': 'error', 'message': 'No term specified'}), 400
+        
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # One grouped outer join for every roster in the term, so sports with
+        # no registrations still come back with an empty list.
+        rows = db.session.query(
+            Sport.id, Sport.name, Student.id, Student.name, Student.email, Student.phone, Student.year
+        ).outerjoin(StudentSport, StudentSport.sport_id == Sport.id).outerjoin(
+            Student, Student.id == StudentSport.student_id
+        ).filter(Sport.term_id == term_id).order_by(Sport.id, StudentSport.id).all()
+        
+        rosters = {}
+        for sport_id, sport_name, student_id, name, email, phone, year in rows:
+            roster = rosters.setdefault(sport_id, {'id': sport_id, 'name': sport_name, 'students': []})
+            if student_id is not None:
+                roster['students'].append({'id': student_id, 'name': name, 'email': email, 'phone': phone, 'year': year})
+        return tagged({'sports': list(rosters.values())}, etag), 200
+    except Exception as e:
+        logger.error(f"Error fetching registrations: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error fetching registrations'}), 500
+
+@bp.route('/get-term-stats', methods=['GET'])
+def get_term_stats():
+    try:
+        term_id = request.args.get('term_id', type=int)
+        if not term_id:
+            term_id = active_term_id()
+        
+        if not term_id:
+            return jsonify({'status': 'error', 'message': 'No term specified'}), 400
+        
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        return tagged(term_stats(term_id, etag), etag), 200
+    except Exception as e:
+        logger.error(f"Error fetching term stats: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error fetching term stats'}), 500
+
+@bp.route('/reconcile-counts', methods=['POST', 'OPTIONS'])
+def reconcile_counts_route():
+    if request.method == "OPTIONS":
+        return '', 200
+    
+    try:
+        repaired = reconcile_counts(request.args.get('term_id', type=int))
+        return jsonify({'status': 'success', 'repaired': repaired}), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error reconciling counts: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error reconciling counts'}), 500
+
+EXPORT_HEADER = ['Year', 'Name', 'Email', 'Phone', 'Sports']
+
+# Students come back in ix_student_export_order (year, surname, name) with one
+# row per sport, so SQLite never sorts the term.
+def export_query(term_id):
+    return db.select(
+        Student.id, Student.year, Student.name, Student.email, Student.phone, Sport.name
+    ).outerjoin(StudentSport, StudentSport.student_id == Student.id).outerjoin(
+        Sport, Sport.id == StudentSport.sport_id
+    ).where(Student.term_id == term_id).order_by(
+        db.cast(Student.year, db.Integer), Student.surname_key, Student.name, Student.id
+    )
+
+def export_rows(term_id, archived=False):
+    # Consecutive rows for the same student are merged into a single line,
+    # with the sports sorted here.
+    stmt = export_query(term_id).execution_options(yield_per=current_app.config['EXPORT_BATCH_SIZE'])
+    
+    current_id = None
+    current = None
+    bind = {'bind': archive_engine(term_id)} if archived else None
+    for student_id, year, name, email, phone, sport_name in db.session.execute(stmt, bind_arguments=bind):
+        if student_id != current_id:
+            if current:
+                yield current[:4] + ['; '.join(sorted(current[4]))]
+            current_id = student_id
+            current = [year, name, email, phone, []]
+        if sport_name:
+            current[4].append(sport_name)
+    if current:
+        yield current[:4] + ['; '.join(sorted(current[4]))]
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % current_app.config['EXPORT_BATCH_SIZE'] == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@bp.route('/export', methods=['GET'])
+def export_data():
+    try:
+        term_id = request.args.get('term_id', type=int)
+        if not term_id:
+            term_id = active_term_id()
+        
+        if not term_id:
+            return jsonify({'status': 'error', 'message': 'No term specified'}), 400
+        
+        term = db.session.get(Term, term_id)
+        if not term:
+            return jsonify({'status': 'error', 'message': 'Term not found'}), 404
+        
+        export_format = request.args.get('format', 'csv').lower()
+        filename = f"sports_data_{term.term_name}_{term.year}".replace(' ', '_')
+        
+        if export_format == 'csv':
+            response = Response(stream_with_context(stream_csv(export_rows(term_id, term.archived))), mimetype='text/csv')
+            response.headers['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+        
+        if export_format == 'xlsx':
+            if Workbook is None:
+                return jsonify({'status': 'error', 'message': 'XLSX export requires openpyxl'}), 400
+            
+            # Write-only workbooks stream rows to disk instead of building the
+            # sheet in memory; the zip container still has to be finished
+            # before it can be sent.
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet(title=term.term_name[:31] or 'Students')
+            sheet.append(EXPORT_HEADER)
+            for row in export_rows(term_id, term.archived):
+                sheet.append(row)
+            output = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+            workbook.save(output)
+            output.seek(0)
+            return send_file(
+                output,
+                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                as_attachment=True,
+                download_name=f'{filename}.xlsx'
+            )
+        
+        return jsonify({'status': 'error', 'message': 'Format must be csv or xlsx'}), 400
+    except Exception as e:
+        logger.error(f"Error exporting data: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error exporting data'}), 500
+
+@bp.route('/delete-student/<int:student_id>', methods=['DELETE'])
 def delete_student(student_id):
     try:
-        student = Student.query.get(student_id)
-        if not student:
+        term_id = db.session.execute(db.select(Student.term_id).filter_by(id=student_id)).scalar()
+        if not term_id:
             return jsonify({'status': 'error', 'message': 'Student not found'}), 404
         
-        selections = StudentSport.query.filter_by(student_id=student_id).all()
-        for selection in selections:
-            sport = Sport.query.get(selection.sport_id)
-            if sport:
-                sport.current_count = max(0, sport.current_count - 1)
-        
+        # (student_id, sport_id) is unique, so each of the student's sports
+        # gives back exactly one seat.
+        Sport.query.filter(
+            Sport.id.in_(db.select(StudentSport.sport_id).where(StudentSport.student_id == student_id))
+        ).update({Sport.current_count: db.case((Sport.current_count > 0, Sport.current_count - 1), else_=0)},
+                 synchronize_session=False)
         StudentSport.query.filter_by(student_id=student_id).delete()
         Waitlist.query.filter_by(student_id=student_id).delete()
-        db.session.delete(student)
+        Student.query.filter_by(id=student_id).delete()
+        bump_version(term_id)
+        promoted = promote_waitlist(term_id)
         db.session.commit()
-        return jsonify({'status': 'success', 'message': 'Student deleted'}), 200
+        publish_sports(term_id)
+        return jsonify({'status': 'success', 'message': 'Student deleted', 'promoted': promoted}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error deleting student: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error deleting student'}), 500
 
-@app.route('/delete-all-students', methods=['DELETE'])
+@bp.route('/delete-all-students', methods=['DELETE'])
 def delete_all_students():
     try:
-        term_id = request.args.get('term_id')
+        term_id = request.args.get('term_id', type=int)
         if not term_id:
             return jsonify({'status': 'error', 'message': 'Term required'}), 400
+        term = db.session.get(Term, term_id)
+        if not term:
+            return jsonify({'status': 'error', 'message': 'Term not found'}), 404
+        if term.archived:
+            return jsonify({'status': 'error', 'message': 'Restore the term before changing it'}), 400
         
-        StudentSport.query.delete()
-        Waitlist.query.delete()
-        students = Student.query.filter_by(term_id=term_id).all()
-        for student in students:
-            db.session.delete(student)
-        for sport in Sport.query.filter_by(term_id=term_id).all():
-            sport.current_count = 0
+        term_students = db.select(Student.id).where(Student.term_id == term_id)
+        StudentSport.query.filter(StudentSport.student_id.in_(term_students)).delete(synchronize_session=False)
+        Waitlist.query.filter(Waitlist.student_id.in_(term_students)).delete(synchronize_session=False)
+        Student.query.filter_by(term_id=term_id).delete(synchronize_session=False)
+        Sport.query.filter_by(term_id=term_id).update({'current_count': 0}, synchronize_session=False)
+        bump_version(term_id)
         db.session.commit()
+        publish_sports(term_id)
         return jsonify({'status': 'success', 'message': 'All students deleted'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error deleting all students: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error deleting students'}), 500
 
-@app.route('/add-sport', methods=['POST', 'OPTIONS'])
+def read_import_rows():
+    upload = request.files.get('file')
+    if upload:
+        text = upload.read().decode('utf-8-sig')
+        if upload.filename and upload.filename.lower().endswith('.json'):
+            payload = json.loads(text)
+        else:
+            return list(csv.DictReader(io.StringIO(text)))
+    elif request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        payload = request.get_json(silent=True)
+    
+    if isinstance(payload, dict):
+        payload = payload.get('students')
+    return payload if isinstance(payload, list) else None
+
+@bp.route('/import-students', methods=['POST', 'OPTIONS'])
+def import_students():
+    if request.method == "OPTIONS":
+        return '', 200
+    
+    try:
+        term_id = request.args.get('term_id', type=int) or request.form.get('term_id', type=int)
+        if not term_id:
+            term_id = active_term_id()
+        
+        term = db.session.get(Term, term_id) if term_id else None
+        if not term:
+            return jsonify({'status': 'error', 'message': 'No term specified'}), 400
+        if term.archived:
+            return jsonify({'status': 'error', 'message': 'Restore the term before changing it'}), 400
+        
+        try:
+            rows = read_import_rows()
+        except (ValueError, UnicodeDecodeError, csv.Error):
+            return jsonify({'status': 'error', 'message': 'Could not read import file'}), 400
+        
+        if not rows:
+            return jsonify({'status': 'error', 'message': 'No students provided'}), 400
+        
+        existing = set(db.session.execute(db.select(Student.email).where(Student.term_id == term_id)).scalars())
+        students = []
+        skipped = []
+        for line, row in enumerate(rows, 1):
+            if not isinstance(row, dict):
+                skipped.append({'row': line, 'message': 'Invalid row'})
+                continue
+            
+            student, error = clean_student({str(k).strip().lower(): v for k, v in row.items() if k})
+            if error:
+                skipped.append({'row': line, 'message': error})
+                continue
+            
+            if student['email'] in existing:
+                skipped.append({'row': line, 'message': 'Already registered this term'})
+                continue
+            
+            existing.add(student['email'])
+            student['term_id'] = term_id
+            student['surname_key'] = surname_key(student['name'])
+            students.append(student)
+        
+        # Core inserts go out as executemany batches instead of one ORM
+        # object and INSERT per row.
+        batch_size = current_app.config['IMPORT_BATCH_SIZE']
+        for start in range(0, len(students), batch_size):
+            db.session.execute(db.insert(Student), students[start:start + batch_size])
+        if students:
+            bump_version(term_id)
+        db.session.commit()
+        return jsonify({'status': 'success', 'message': f'Imported {len(students)} students', 'imported': len(students), 'skipped': skipped}), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error importing students: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error importing students'}), 500
+
+@bp.route('/add-sport', methods=['POST', 'OPTIONS'])
 def add_sport():
     if request.method == "OPTIONS":
         return '', 200
@@ -379,16 +2331,24 @@ def add_sport():
         except ValueError:
             return jsonify({'status': 'error', 'message': 'Capacity must be a number'}), 400
         
+        term = db.session.get(Term, term_id)
+        if not term:
+            return jsonify({'status': 'error', 'message': 'Term not found'}), 404
+        if term.archived:
+            return jsonify({'status': 'error', 'message': 'Restore the term before changing it'}), 400
+        
         new_sport = Sport(name=sport_name, description=description, capacity=capacity, is_open=True, term_id=term_id)
         db.session.add(new_sport)
+        bump_version(int(term_id))
         db.session.commit()
+        publish_sports(term_id)
         return jsonify({'status': 'success', 'message': 'Sport added', 'sport_id': new_sport.id}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error adding sport: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error adding sport'}), 500
 
-@app.route('/update-sport/<int:sport_id>', methods=['PUT', 'OPTIONS'])
+@bp.route('/update-sport/<int:sport_id>', methods=['PUT', 'OPTIONS'])
 def update_sport(sport_id):
     if request.method == "OPTIONS":
         return '', 200
@@ -420,64 +2380,68 @@ def update_sport(sport_id):
         if 'is_open' in data:
             sport.is_open = data.get('is_open')
         
+        bump_version(sport.term_id)
+        promoted = []
+        if sport.is_open and sport.current_count < sport.capacity:
+            promoted = promote_waitlist(sport.term_id)
         db.session.commit()
-        return jsonify({'status': 'success', 'message': 'Sport updated'}), 200
+        publish_sports(sport.term_id)
+        return jsonify({'status': 'success', 'message': 'Sport updated', 'promoted': promoted}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error updating sport: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error updating sport'}), 500
 
-@app.route('/delete-sport/<int:sport_id>', methods=['DELETE'])
+@bp.route('/delete-sport/<int:sport_id>', methods=['DELETE'])
 def delete_sport(sport_id):
     try:
         sport = Sport.query.get(sport_id)
         if not sport:
             return jsonify({'status': 'error', 'message': 'Sport not found'}), 404
         
-        StudentSport.query.filter_by(sport_id=sport_id).delete()
+        rostered = [row[0] for row in db.session.query(StudentSport.student_id).filter_by(sport_id=sport_id)]
+        StudentSport.query.filter_by(sport_id=sport_id).delete(synchronize_session=False)
+        # Students left without any sport are back on the waitlist.
+        if rostered:
+            Waitlist.query.filter(
+                Waitlist.student_id.in_(rostered),
+                ~db.select(StudentSport.id).where(StudentSport.student_id == Waitlist.student_id).exists()
+            ).update({'has_sport': False}, synchronize_session=False)
+        Waitlist.query.filter_by(sport_id=sport_id).update({'sport_id': None}, synchronize_session=False)
+        term_id = sport.term_id
         db.session.delete(sport)
+        bump_version(term_id)
         db.session.commit()
+        publish_sports(term_id)
         return jsonify({'status': 'success', 'message': 'Sport deleted'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error deleting sport: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error deleting sport'}), 500
 
-@app.route('/get-system-status', methods=['GET'])
+@bp.route('/get-system-status', methods=['GET'])
 def get_system_status():
     try:
-        current_term = Term.query.filter_by(is_active=True).first()
+        current_term = term_cache.active_term()
         if not current_term:
-            return jsonify({'is_open': False, 'open_datetime': ''}), 200
+            return jsonify(status_payload(None)), 200
         
-        status = SystemStatus.query.filter_by(term_id=current_term.id).first()
+        status = term_cache.status(current_term.id)
         if not status:
-            status = SystemStatus(is_open=False, open_datetime='', term_id=current_term.id)
-            db.session.add(status)
-            db.session.commit()
-        
-        if not status.is_open and status.open_datetime:
-            try:
-                scheduled = datetime.fromisoformat(status.open_datetime)
-                now = datetime.now()
-                if now >= scheduled:
-                    status.is_open = True
-                    db.session.commit()
-            except ValueError:
-                logger.warning(f"Invalid datetime format: {status.open_datetime}")
+            return jsonify(status_payload(None)), 200
         
-        return jsonify({'is_open': status.is_open, 'open_datetime': status.open_datetime}), 200
+        return jsonify(status_payload(status)), 200
     except Exception as e:
         logger.error(f"Error fetching system status: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching status'}), 500
 
-@app.route('/set-system-status', methods=['POST', 'OPTIONS'])
+@bp.route('/set-system-status', methods=['POST', 'OPTIONS'])
 def set_system_status():
     if request.method == "OPTIONS":
         return '', 200
     
     try:
-        current_term = Term.query.filter_by(is_active=True).first()
+        current_term = term_cache.active_term()
         if not current_term:
             return jsonify({'status': 'error', 'message': 'No active term'}), 400
         
@@ -485,24 +2449,34 @@ def set_system_status():
         if not data:
             return jsonify({'status': 'error', 'message': 'No data provided'}), 400
         
+        for field in ('open_datetime', 'close_datetime'):
+            if data.get(field) and not parse_schedule(data.get(field)):
+                return jsonify({'status': 'error', 'message': 'Invalid date and time'}), 400
+        
         status = SystemStatus.query.filter_by(term_id=current_term.id).first()
         if not status:
-            status = SystemStatus(is_open=data.get('is_open', False), open_datetime=data.get('open_datetime', ''), term_id=current_term.id)
+            status = SystemStatus(is_open=data.get('is_open', False), open_datetime=data.get('open_datetime', ''),
+                                  close_datetime=data.get('close_datetime', ''), term_id=current_term.id)
             db.session.add(status)
         else:
             if 'is_open' in data:
                 status.is_open = data.get('is_open')
             if 'open_datetime' in data:
                 status.open_datetime = data.get('open_datetime')
+            if 'close_datetime' in data:
+                status.close_datetime = data.get('close_datetime')
         
         db.session.commit()
+        term_cache.invalidate()
+        scheduler.wake()
+        publish_status(current_term.id, status)
         return jsonify({'status': 'success', 'message': 'System status updated'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error setting system status: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error setting status'}), 500
 
-@app.route('/generate-delete-code', methods=['GET'])
+@bp.route('/generate-delete-code', methods=['GET'])
 def generate_delete_code():
     try:
         code = secrets.token_hex(4).upper()
@@ -511,28 +2485,33 @@ def generate_delete_code():
         logger.error(f"Error generating delete code: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error generating code'}), 500
 
-@app.route('/get-waitlist', methods=['GET'])
+@bp.route('/get-waitlist', methods=['GET'])
 def get_waitlist():
     try:
-        term_id = request.args.get('term_id')
+        term_id = request.args.get('term_id', type=int)
         if not term_id:
-            current_term = Term.query.filter_by(is_active=True).first()
-            term_id = current_term.id if current_term else None
+            term_id = active_term_id()
         
         if not term_id:
             return jsonify({'status': 'error', 'message': 'No term specified'}), 400
         
-        waitlisted = db.session.query(Student, Waitlist).join(Waitlist).filter(
+        etag = term_etag(term_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        rows = db.session.query(
+            Student.id, Student.email, Student.name, Student.phone, Student.year, Waitlist.sport_id
+        ).join(Waitlist, Waitlist.student_id == Student.id).filter(
             Student.term_id == term_id,
             Waitlist.has_sport == False
-        ).all()
-        waitlist_data = [{'id': s.id, 'email': s.email, 'name': s.name, 'phone': s.phone, 'year': s.year} for s, w in waitlisted]
-        return jsonify({'waitlist': waitlist_data}), 200
+        ).order_by(Waitlist.timestamp, Waitlist.id).all()
+        return tagged({'waitlist': as_dicts(STUDENT_FIELDS + ('sport_id',), rows)}, etag), 200
     except Exception as e:
         logger.error(f"Error fetching waitlist: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error fetching waitlist'}), 500
 
-@app.route('/add-to-waitlist/<int:student_id>', methods=['POST', 'OPTIONS'])
+@bp.route('/add-to-waitlist/<int:student_id>', methods=['POST', 'OPTIONS'])
 def add_to_waitlist(student_id):
     if request.method == "OPTIONS":
         return '', 200
@@ -542,16 +2521,108 @@ def add_to_waitlist(student_id):
         if not student:
             return jsonify({'status': 'error', 'message': 'Student not found'}), 404
         
-        if not Waitlist.query.filter_by(student_id=student_id).first():
-            waitlist_entry = Waitlist(student_id=student_id)
-            db.session.add(waitlist_entry)
-            db.session.commit()
+        data = request.get_json(silent=True) or {}
+        sport_id = data.get('sport_id') or None
+        if sport_id and not Sport.query.filter_by(id=sport_id, term_id=student.term_id).first():
+            return jsonify({'status': 'error', 'message': 'Sport not found'}), 404
+        
+        waitlist_entry = Waitlist.query.filter_by(student_id=student_id).first()
+        if not waitlist_entry:
+            db.session.add(Waitlist(student_id=student_id, sport_id=sport_id))
+        elif waitlist_entry.sport_id != sport_id:
+            waitlist_entry.sport_id = sport_id
+        else:
+            return jsonify({'status': 'success', 'message': 'Added to waitlist'}), 200
+        bump_version(student.term_id)
+        db.session.commit()
         return jsonify({'status': 'success', 'message': 'Added to waitlist'}), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error adding to waitlist: {str(e)}")
         return jsonify({'status': 'error', 'message': 'Error adding to waitlist'}), 500
 
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@bp.route('/stream', methods=['GET'])
+def stream():
+    explicit_term = request.args.get('term_id', type=int)
+    subscriber = live_updates.subscribe(explicit_term)
+    if subscriber is None:
+        # EventSource does not reconnect after an error status, so the page
+        # falls back to polling /live-state.
+        response = jsonify({'status': 'error', 'message': 'Too many live connections, poll /live-state instead'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    live_poller.start()
+    try:
+        term_id = explicit_term or active_term_id()
+        if term_id:
+            initial = [('status', live_snapshot('status', term_id)), ('sports', live_snapshot('sports', term_id))]
+        else:
+            initial = [('status', json.dumps(status_payload(None)))]
+    except Exception as e:
+        live_updates.unsubscribe(subscriber)
+        logger.error(f"Error opening stream: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error opening stream'}), 500
+    finally:
+        # The stream can stay open for hours; don't pin a pooled connection to it.
+        db.session.remove()
+
+    def format_event(event, data):
+        return f"event: {event}\ndata: {data}\n\n"
+
+    def generate():
+        current = term_id
+        try:
+            yield 'retry: 2000\n\n'
+            for event, data in initial:
+                yield format_event(event, data)
+            while True:
+                try:
+                    event, event_term, data = subscriber.get(timeout=live_updates.keepalive)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                if event == 'term':
+                    if explicit_term:
+                        continue
+                    current = event_term
+                    yield format_event(event, data)
+                elif event_term == current:
+                    yield format_event(event, data)
+        finally:
+            live_updates.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    # A client that goes away before the first chunk never starts generate(),
+    # so its finally would not run and the slot would stay taken.
+    response.call_on_close(lambda: live_updates.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/live-state', methods=['GET'])
+def live_state():
+    try:
+        term_id = request.args.get('term_id', type=int) or active_term_id()
+        if not term_id:
+            return jsonify({'term_id': None, 'status': status_payload(None), 'sports': []}), 200
+        
+        status = json.loads(live_snapshot('status', term_id))
+        sports = json.loads(live_snapshot('sports', term_id))['sports']
+        return jsonify({'term_id': term_id, 'status': status, 'sports': sports}), 200
+    except Exception as e:
+        logger.error(f"Error fetching live state: {str(e)}")
+        return jsonify({'status': 'error', 'message': 'Error fetching live state'}), 500
+
 if __name__ == '__main__':
+    app = create_app({'ASSET_RELOAD': True})
+    with app.app_context():
+        init_db()
+        seed_db()
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.start()
     app.run(host='0.0.0.0', port=5000, debug=True)
      
\ No newline at end of file
@@ -0,0 +1,305 @@
+# Load test for the registration rush, run offline against a throwaway SQLite
+# database through the Flask test client:
+#
+#   python bench.py --students 300 --sports 6 --capacity 25 --output results.json
+#
+# Students poll /get-system-status and /get-sports while registration is
+# closed, then all call /submit-form and /submit-sport the moment it opens.
+#
+# With --lists, it instead times the admin list endpoints against one large
+# term, and compares ORM entity loading with column projection:
+#
+#   python bench.py --lists --students 5000 --iterations 20
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark the registration rush against a temporary database.')
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--sports', type=int, default=5)
+    parser.add_argument('--capacity', type=int, default=20)
+    parser.add_argument('--poll-rounds', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--write-behind', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='')
+    parser.add_argument('--lists', action='store_true')
+    parser.add_argument('--iterations', type=int, default=20)
+    return parser.parse_args()
+
+
+class LockErrorCounter(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def emit(self, record):
+        if 'locked' in record.getMessage():
+            with self.lock:
+                self.count += 1
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, client, method, path, endpoint, **kwargs):
+        start = time.perf_counter()
+        response = client.open(path, method=method, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self.lock:
+            self.timings[endpoint].append(elapsed)
+            if response.status_code >= 500:
+                self.errors[endpoint] += 1
+        return response
+
+    def summary(self):
+        endpoints = {}
+        for endpoint, timings in sorted(self.timings.items()):
+            timings = sorted(timings)
+            endpoints[endpoint] = {
+                'count': len(timings),
+                'server_errors': self.errors[endpoint],
+                'mean_ms': round(statistics.fmean(timings), 3),
+                'p50_ms': round(percentile(timings, 50), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'p99_ms': round(percentile(timings, 99), 3),
+                'max_ms': round(timings[-1], 3),
+            }
+        return endpoints
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = (len(sorted_values) - 1) * pct / 100
+    lower = int(index)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (index - lower)
+
+
+def run_phase(executor, task, items):
+    start = time.perf_counter()
+    list(executor.map(task, items))
+    return time.perf_counter() - start
+
+
+def timed(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {'mean_ms': round(statistics.fmean(timings), 3), 'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3)}
+
+
+def seed_term(server, app, args):
+    with app.app_context():
+        db = server.db
+        term_id = server.active_term_id()
+        sport_ids = []
+        for i in range(args.sports):
+            sport = server.Sport(name=f'Sport {i + 1}', capacity=args.students, current_count=0, term_id=term_id)
+            db.session.add(sport)
+            db.session.flush()
+            sport_ids.append(sport.id)
+        db.session.execute(db.insert(server.Student), [{
+            'email': f'student{i}@stmarks.nsw.edu.au', 'name': f'Student {i}', 'phone': '0412345678',
+            'year': random.choice(['7', '8', '9', '10']), 'term_id': term_id, 'surname_key': str(i)
+        } for i in range(args.students)])
+        student_ids = db.session.execute(db.select(server.Student.id).where(server.Student.term_id == term_id)).scalars().all()
+        # Most students get a sport; the rest sit on the waitlist.
+        registered = student_ids[:int(len(student_ids) * 0.9)]
+        db.session.execute(db.insert(server.StudentSport), [
+            {'student_id': student_id, 'sport_id': sport_ids[n % len(sport_ids)]} for n, student_id in enumerate(registered)
+        ])
+        db.session.execute(db.insert(server.Waitlist), [
+            {'student_id': student_id, 'has_sport': False} for student_id in student_ids[len(registered):]
+        ])
+        server.reconcile_counts(term_id)
+        return term_id, sport_ids
+
+
+def run_lists(server, app, args):
+    term_id, sport_ids = seed_term(server, app, args)
+    client = app.test_client()
+    endpoints = {
+        '/get-sports': f'/get-sports?term_id={term_id}',
+        '/get-all-data': f'/get-all-data?term_id={term_id}',
+        '/get-all-data (page)': f'/get-all-data?term_id={term_id}&limit=100',
+        '/get-sport-registrations': f'/get-sport-registrations/{sport_ids[0]}',
+        '/get-waitlist': f'/get-waitlist?term_id={term_id}',
+        '/get-registrations': f'/get-registrations?term_id={term_id}',
+    }
+
+    def fetch(path):
+        response = client.get(path)
+        assert response.status_code == 200, (path, response.status_code)
+
+    providers = {type(app.json).__name__: app.json}
+    if type(app.json) is not server.DefaultJSONProvider:
+        providers['DefaultJSONProvider'] = server.DefaultJSONProvider(app)
+    results = {'endpoints': {}, 'hydration': {}}
+    for name, provider in providers.items():
+        app.json = provider
+        results['endpoints'][name] = {label: timed(lambda: fetch(path), args.iterations) for label, path in endpoints.items()}
+
+    # The same 5,000-row read, materialised as ORM entities and as plain rows.
+    with app.app_context():
+        Student = server.Student
+        columns = (Student.id, Student.email, Student.name, Student.phone, Student.year)
+
+        def entities():
+            students = Student.query.filter(Student.term_id == term_id).all()
+            server.db.session.expunge_all()
+            return [{'id': s.id, 'email': s.email, 'name': s.name, 'phone': s.phone, 'year': s.year} for s in students]
+
+        def projected():
+            rows = server.db.session.query(*columns).filter(Student.term_id == term_id).all()
+            return [dict(zip(('id', 'email', 'name', 'phone', 'year'), row)) for row in rows]
+
+        results['hydration'] = {'orm_entities': timed(entities, args.iterations), 'column_projection': timed(projected, args.iterations)}
+
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': vars(args),
+        'students': args.students,
+        **results,
+    }
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='sports-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['WRITE_BEHIND'] = '1' if args.write_behind else '0'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    import app as server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    app = server.create_app()
+    with app.app_context():
+        server.init_db()
+        server.seed_db()
+
+    random.seed(args.seed)
+    if args.lists:
+        results = run_lists(server, app, args)
+        print(json.dumps(results, indent=2))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        shutil.rmtree(workdir, ignore_errors=True)
+        return 0
+    lock_errors = LockErrorCounter()
+    server.logger.addHandler(lock_errors)
+
+    admin = app.test_client()
+    term_id = admin.get('/get-current-term').get_json()['term_id']
+    admin.post('/set-system-status', json={'is_open': False})
+    sport_ids = []
+    for i in range(args.sports):
+        response = admin.post('/add-sport', json={'name': f'Sport {i + 1}', 'capacity': args.capacity, 'term_id': term_id})
+        sport_ids.append(response.get_json()['sport_id'])
+
+    recorder = Recorder()
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        return local.client
+
+    def poll(student):
+        for _ in range(args.poll_rounds):
+            recorder.call(client(), 'GET', '/get-system-status', '/get-system-status')
+            recorder.call(client(), 'GET', '/get-sports', '/get-sports')
+
+    def register(student):
+        response = recorder.call(client(), 'POST', '/submit-form', '/submit-form', json={
+            'email': f'student{student}@stmarks.nsw.edu.au',
+            'name': f'Student {student}',
+            'phone': '0412345678',
+            'year': random.choice(['7', '8', '9', '10']),
+        })
+        if response.status_code != 200:
+            return
+        student_id = response.get_json()['student_id']
+        for sport_id in random.sample(sport_ids, len(sport_ids)):
+            response = recorder.call(client(), 'POST', '/submit-sport', '/submit-sport',
+                                     json={'student_id': student_id, 'sport_id': sport_id})
+            if response.status_code == 200 or response.status_code >= 500:
+                return
+            if response.get_json().get('message') != 'Sport is now full':
+                return
+
+    students = range(args.students)
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        polling_seconds = run_phase(executor, poll, students)
+        admin.post('/set-system-status', json={'is_open': True})
+        registration_seconds = run_phase(executor, register, students)
+
+    with app.app_context():
+        rows = server.db.session.query(server.Sport.id, server.Sport.capacity, server.Sport.current_count).all()
+        registered = dict(server.db.session.query(
+            server.StudentSport.sport_id, server.db.func.count(server.StudentSport.id)
+        ).group_by(server.StudentSport.sport_id).all())
+    violations = [
+        {'sport_id': sport_id, 'capacity': capacity, 'current_count': current_count, 'registrations': registered.get(sport_id, 0)}
+        for sport_id, capacity, current_count in rows
+        if current_count > capacity or registered.get(sport_id, 0) > capacity or registered.get(sport_id, 0) != current_count
+    ]
+
+    polling_requests = args.students * args.poll_rounds * 2
+    registration_requests = sum(len(recorder.timings[e]) for e in ('/submit-form', '/submit-sport'))
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'config': vars(args),
+        'startup_seconds': round(app.config['STARTUP_SECONDS'], 4),
+        'phases': {
+            'polling': {
+                'requests': polling_requests,
+                'seconds': round(polling_seconds, 3),
+                'throughput_rps': round(polling_requests / polling_seconds, 1) if polling_seconds else None,
+            },
+            'registration': {
+                'requests': registration_requests,
+                'seconds': round(registration_seconds, 3),
+                'throughput_rps': round(registration_requests / registration_seconds, 1) if registration_seconds else None,
+            },
+        },
+        'endpoints': recorder.summary(),
+        'lock_errors': lock_errors.count,
+        'registrations': sum(registered.values()),
+        'seats': args.sports * args.capacity,
+        'capacity_violations': violations,
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    shutil.rmtree(workdir, ignore_errors=True)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
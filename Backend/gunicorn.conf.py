@@ -0,0 +1,35 @@
+# Gunicorn settings, tunable from the environment. Threaded workers keep
+# long-lived /stream connections from pinning a whole process each.
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 32))
+worker_class = os.environ.get('WEB_WORKER_CLASS', 'gthread')
+# Every open /stream still holds one of a gthread worker's threads for as long
+# as the page is open, so each worker only takes streams up to three quarters
+# of its threads and keeps the rest for registrations. Students turned away
+# poll /live-state instead. Async workers (WEB_WORKER_CLASS=gevent) do not pin
+# threads; set STREAM_LIMIT=0 with them.
+os.environ.setdefault('STREAM_LIMIT', str(threads * 3 // 4 if worker_class == 'gthread' else 0))
+# Workers add their metrics up through files in METRICS_DIR, so a scrape of
+# /metrics reaching any worker reports the whole server. The files are cleared
+# when gunicorn starts, which resets the counters the way a restart would.
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'sports-metrics'))
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 0))
+# The app holds threads and database connections, neither of which survive a
+# fork, so every worker imports and builds it itself.
+preload_app = False
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-')
+
+
+def on_starting(server):
+    for path in glob.glob(os.path.join(os.environ['METRICS_DIR'], 'metrics-*.json')):
+        os.remove(path)
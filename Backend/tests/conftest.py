@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    # The caches and live-update channels are module singletons keyed by
+    # tenant and term id, so every test starts them empty.
+    server.term_cache.invalidate()
+    server.term_stats_cache.clear()
+    server.live_updates.snapshots.clear()
+    server.live_updates.active_terms.clear()
+
+    def make(**config):
+        settings = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'sports.db'}",
+            'ARCHIVE_DIR': str(tmp_path / 'archive'),
+        }
+        settings.update(config)
+        app = server.create_app(settings)
+        with app.app_context():
+            server.init_db()
+            server.seed_db()
+        return app
+    return make
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def term_id(client):
+    return client.get('/get-current-term').get_json()['term_id']
+
+
+@pytest.fixture
+def register(app):
+    def register(client, n, year='8'):
+        response = client.post('/submit-form', json={
+            'email': f"student{n}@{app.config['EMAIL_DOMAIN']}",
+            'name': f'Student {n}',
+            'phone': '0412345678',
+            'year': year,
+        })
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['student_id']
+    return register
@@ -0,0 +1,25 @@
+import io
+
+
+def test_archived_terms_refuse_writes_and_restore_cleanly(client, term_id, register):
+    client.post('/add-sport', json={'name': 'Netball', 'capacity': 5, 'term_id': term_id})
+    register(client, 1)
+    old_term_id = client.post('/create-term', json={'term_name': 'Term 2', 'year': 2025}).get_json()['term_id']
+    client.post(f'/set-active-term/{old_term_id}')
+    assert client.post(f'/archive-term/{term_id}').status_code == 200
+
+    upload = 'email,name,phone,year\nstudent1@stmarks.nsw.edu.au,Student One,0412345678,8\n'
+    writes = [
+        client.post(f'/import-students?term_id={term_id}', content_type='multipart/form-data',
+                    data={'file': (io.BytesIO(upload.encode()), 'students.csv')}),
+        client.post('/add-sport', json={'name': 'Hockey', 'capacity': 5, 'term_id': term_id}),
+        client.delete(f'/delete-all-students?term_id={term_id}'),
+    ]
+    for response in writes:
+        assert (response.status_code, response.get_json()['message']) == (400, 'Restore the term before changing it')
+
+    response = client.post(f'/restore-term/{term_id}')
+    assert response.status_code == 200
+    assert response.get_json()['rows']['student'] == 1
+    sports = client.get(f'/get-sports?term_id={term_id}').get_json()['sports']
+    assert [s['name'] for s in sports] == ['Netball']
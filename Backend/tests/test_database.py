@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import app as server
+
+
+def pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+
+def test_every_sqlite_engine_gets_the_pragmas(make_app, tmp_path):
+    app = make_app(SQLITE_BUSY_TIMEOUT_MS=4321, TENANTS={
+        'north': {'database_url': f"sqlite:///{tmp_path / 'north.db'}"},
+    })
+    with app.app_context():
+        engines = {'default': server.db.engine, 'north': server.tenants.engine(server.tenants.by_slug['north'])}
+        for slug, engine in engines.items():
+            assert pragma(engine, 'journal_mode') == 'wal', slug
+            assert pragma(engine, 'busy_timeout') == 4321, slug
+            assert pragma(engine, 'synchronous') == 1, slug
+
+
+def test_writes_commit_while_a_read_is_open(make_app):
+    # With a rollback journal the commit would wait for the reader's shared
+    # lock and fail once the short busy timeout ran out.
+    app = make_app(SQLITE_BUSY_TIMEOUT_MS=200)
+    client = app.test_client()
+    term_id = client.get('/get-current-term').get_json()['term_id']
+    client.post('/add-sport', json={'name': 'Netball', 'capacity': 5, 'term_id': term_id})
+    with app.app_context():
+        reader = server.db.engine.raw_connection()
+    try:
+        reader.execute('BEGIN')
+        assert reader.execute('SELECT COUNT(*) FROM sport').fetchone()[0] == 1
+        response = client.post('/add-sport', json={'name': 'Hockey', 'capacity': 5, 'term_id': term_id})
+        assert response.status_code == 200
+        # The open read keeps its snapshot; new reads see the write.
+        assert reader.execute('SELECT COUNT(*) FROM sport').fetchone()[0] == 1
+        assert len(client.get(f'/get-sports?term_id={term_id}').get_json()['sports']) == 2
+        reader.rollback()
+    finally:
+        reader.close()
+
+
+def test_concurrent_readers_and_writers(app, term_id):
+    admin = app.test_client()
+    sport_ids = [admin.post('/add-sport', json={'name': f'Sport {n}', 'capacity': 100, 'term_id': term_id}).get_json()['sport_id']
+                 for n in range(3)]
+    writers, readers, rounds = 8, 8, 10
+    start = threading.Barrier(writers + readers)
+
+    def write(worker):
+        client = app.test_client()
+        start.wait()
+        statuses = []
+        for n in range(rounds):
+            response = client.post('/submit-form', json={
+                'email': f'w{worker}n{n}@stmarks.nsw.edu.au', 'name': f'Writer {worker} {n}',
+                'phone': '0412345678', 'year': '9'})
+            statuses.append(response.status_code)
+            student_id = response.get_json()['student_id']
+            statuses.append(client.post('/submit-sport', json={
+                'student_id': student_id, 'sport_id': sport_ids[n % len(sport_ids)]}).status_code)
+        return statuses
+
+    def read(worker):
+        client = app.test_client()
+        start.wait()
+        statuses = []
+        for _ in range(rounds):
+            statuses.append(client.get(f'/get-sports?term_id={term_id}').status_code)
+            statuses.append(client.get(f'/get-all-data?term_id={term_id}&limit=50').status_code)
+        return statuses
+
+    with ThreadPoolExecutor(max_workers=writers + readers) as executor:
+        futures = [executor.submit(write, w) for w in range(writers)] + [executor.submit(read, r) for r in range(readers)]
+        statuses = [status for future in futures for status in future.result()]
+
+    assert set(statuses) == {200}
+    with app.app_context():
+        assert server.Student.query.filter_by(term_id=term_id).count() == writers * rounds
+        assert sum(s.current_count for s in server.Sport.query.filter_by(term_id=term_id)) == writers * rounds
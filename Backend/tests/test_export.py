@@ -0,0 +1,36 @@
+import csv
+import io
+
+import app as server
+
+
+def test_csv_is_ordered_by_year_then_surname(client, term_id):
+    students = [('Zoe Adams', '10'), ('Amy Young', '7'), ('Bob Brown', '9'), ('Cat Adams', '7'), ('Dan, Jr Smith', '8')]
+    ids = {}
+    for n, (name, year) in enumerate(students):
+        response = client.post('/submit-form', json={
+            'email': f'student{n}@stmarks.nsw.edu.au', 'name': name, 'phone': '0412345678', 'year': year})
+        ids[name] = response.get_json()['student_id']
+    for sport in ('Tennis', 'Golf'):
+        sport_id = client.post('/add-sport', json={'name': sport, 'capacity': 5, 'term_id': term_id}).get_json()['sport_id']
+        client.post('/submit-sport', json={'student_id': ids['Cat Adams'], 'sport_id': sport_id})
+
+    rows = list(csv.reader(io.StringIO(client.get(f'/export?term_id={term_id}').get_data(as_text=True))))
+
+    assert rows[0] == server.EXPORT_HEADER
+    assert [(row[0], row[1], row[4]) for row in rows[1:]] == [
+        ('7', 'Cat Adams', 'Golf; Tennis'),
+        ('7', 'Amy Young', ''),
+        ('8', 'Dan, Jr Smith', ''),
+        ('9', 'Bob Brown', ''),
+        ('10', 'Zoe Adams', ''),
+    ]
+
+
+def test_export_is_read_in_index_order(app, term_id):
+    with app.app_context():
+        query = server.export_query(term_id)
+        sql = str(query.compile(server.db.engine, compile_kwargs={'literal_binds': True}))
+        plan = ' '.join(row[-1] for row in server.db.session.execute(server.db.text('EXPLAIN QUERY PLAN ' + sql)))
+    assert 'ix_student_export_order' in plan
+    assert 'TEMP B-TREE' not in plan
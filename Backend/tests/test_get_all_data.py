@@ -0,0 +1,38 @@
+import app as server
+
+
+def test_pages_follow_surname_order(client, term_id):
+    names = ['Ava Young', 'Ben Adams', 'Cal Young', 'Dee Brown', 'Eli Adams', 'Fay Zhou', 'Gus Brown']
+    for n, name in enumerate(names):
+        response = client.post('/submit-form', json={
+            'email': f'student{n}@stmarks.nsw.edu.au', 'name': name, 'phone': '0412345678', 'year': '8'})
+        assert response.status_code == 200
+
+    shown = []
+    cursor = None
+    while True:
+        url = f'/get-all-data?term_id={term_id}&limit=3' + (f'&after={cursor}' if cursor else '')
+        page = client.get(url).get_json()
+        assert page['total'] == len(names)
+        shown.extend(student['name'] for student in page['students'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert shown == ['Ben Adams', 'Eli Adams', 'Dee Brown', 'Gus Brown', 'Ava Young', 'Cal Young', 'Fay Zhou']
+
+
+def test_invalid_cursor_is_rejected(client, term_id):
+    assert client.get(f'/get-all-data?term_id={term_id}&limit=3&after=nope').status_code == 400
+
+
+def test_listing_order_uses_the_index(app, term_id):
+    with app.app_context():
+        query = server.db.select(server.Student.id).where(
+            server.Student.term_id == term_id,
+            server.db.tuple_(server.Student.surname_key, server.Student.id) > ('adams', 1)
+        ).order_by(server.Student.surname_key, server.Student.id).limit(3)
+        sql = str(query.compile(server.db.engine, compile_kwargs={'literal_binds': True}))
+        plan = ' '.join(row[-1] for row in server.db.session.execute(server.db.text('EXPLAIN QUERY PLAN ' + sql)))
+    assert 'ix_student_term_surname' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,78 @@
+import json
+import queue
+
+import app as server
+
+
+def drain(subscriber):
+    events = []
+    while True:
+        try:
+            event, _, data = subscriber.get_nowait()
+        except queue.Empty:
+            return events
+        events.append((event, json.loads(data)))
+
+
+def test_poller_republishes_writes_from_other_workers(app, client, term_id):
+    client.post('/add-sport', json={'name': 'Netball', 'capacity': 5, 'term_id': term_id})
+    db = server.db
+    with app.app_context():
+        subscriber = server.live_updates.subscribe()
+        try:
+            server.live_poller.poll()
+            drain(subscriber)
+
+            # Another worker claims a seat and opens registration; nothing is
+            # published in this process.
+            db.session.execute(db.update(server.Sport).values(current_count=1))
+            server.bump_version(term_id)
+            db.session.add(server.SystemStatus(is_open=True, term_id=term_id))
+            db.session.commit()
+
+            server.live_poller.poll()
+            events = dict(drain(subscriber))
+            assert events['sports']['sports'][0]['current_count'] == 1
+            assert events['status']['is_open'] is True
+
+            server.live_poller.poll()
+            assert drain(subscriber) == []
+        finally:
+            server.live_updates.unsubscribe(subscriber)
+
+    assert client.get('/live-state').get_json()['status']['is_open'] is True
+
+
+def test_poller_announces_a_term_switched_elsewhere(app, client, term_id):
+    new_term = client.post('/create-term', json={'term_name': 'Term 2', 'year': 2025}).get_json()['term_id']
+    db = server.db
+    with app.app_context():
+        subscriber = server.live_updates.subscribe()
+        try:
+            server.live_poller.poll()
+            drain(subscriber)
+            db.session.execute(db.update(server.Term).values(is_active=server.Term.id == new_term))
+            db.session.commit()
+
+            server.live_poller.poll()
+            assert ('term', {'term_id': new_term}) in drain(subscriber)
+        finally:
+            server.live_updates.unsubscribe(subscriber)
+
+    assert client.get('/get-current-term').get_json()['term_id'] == new_term
+
+
+def test_streams_beyond_the_limit_are_turned_away(make_app):
+    app = make_app(STREAM_LIMIT=1)
+    client = app.test_client()
+
+    first = client.get('/stream')
+    assert first.status_code == 200
+    turned_away = client.get('/stream')
+    assert turned_away.status_code == 503
+    assert turned_away.headers['Retry-After'] == '30'
+
+    first.close()
+    again = client.get('/stream')
+    assert again.status_code == 200
+    again.close()
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import app as server
+
+
+def test_failed_statements_leave_no_timer_state(app):
+    with app.app_context():
+        with server.db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.exec_driver_sql('SELECT * FROM no_such_table')
+            assert conn.exec_driver_sql('SELECT 1').scalar() == 1
+            assert isinstance(conn.info['query_start'], float)
+
+
+def test_metrics_report_queries_per_route(client, term_id):
+    client.get(f'/get-sports?term_id={term_id}')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'sports_request_queries_count{route="/get-sports",method="GET"}' in body
+    assert 'sports_responses_total{route="/get-sports",method="GET",status="200"}' in body
+
+
+def test_metrics_add_up_across_workers(make_app, tmp_path):
+    app = make_app(METRICS_DIR=str(tmp_path / 'metrics'))
+    client = app.test_client()
+    # Another worker that has already flushed (or since exited).
+    other = server.Metrics()
+    other.pid = 'other'
+    other.record('/get-sports', 'GET', 200, 0.01, 2, 0.001, 0)
+    (tmp_path / 'metrics' / 'metrics-other.json').write_text(json.dumps(other.state()))
+
+    client.get('/get-sports')
+    body = client.get('/metrics').get_data(as_text=True)
+
+    # The singleton has also counted earlier tests' requests.
+    served = {(route, method, status): count for route, method, status, count in server.metrics.state()['responses']}
+    total = served[('/get-sports', 'GET', 200)] + 1
+    assert f'sports_responses_total{{route="/get-sports",method="GET",status="200"}} {total}' in body
+    assert f'sports_app_startup_seconds{{pid="{server.metrics.pid}"}}' in body
@@ -0,0 +1,77 @@
+from sqlalchemy.dialects import postgresql
+
+import app as server
+
+
+def test_migrations_merge_duplicate_students(app, client, term_id):
+    db = server.db
+    with app.app_context():
+        # Rebuild what an older database can hold: no unique index, no
+        # migration history, and one student registered twice by the old
+        # check-then-insert race, with drifted counts.
+        db.session.execute(db.text('DROP INDEX ix_student_email_term'))
+        db.session.execute(db.delete(server.SchemaMigration))
+        netball = server.Sport(name='Netball', capacity=5, current_count=2, term_id=term_id)
+        hockey = server.Sport(name='Hockey', capacity=5, current_count=0, term_id=term_id)
+        details = {'email': 'twice@stmarks.nsw.edu.au', 'name': 'Sam Twice', 'phone': '0412345678', 'year': '8',
+                   'term_id': term_id, 'surname_key': 'twice'}
+        first, second = server.Student(**details), server.Student(**details)
+        db.session.add_all([netball, hockey, first, second])
+        db.session.flush()
+        db.session.add_all([
+            server.StudentSport(student_id=first.id, sport_id=netball.id),
+            server.StudentSport(student_id=second.id, sport_id=netball.id),
+            server.StudentSport(student_id=second.id, sport_id=hockey.id),
+            server.Waitlist(student_id=first.id, has_sport=False),
+            server.Waitlist(student_id=second.id, has_sport=False),
+        ])
+        db.session.commit()
+        first_id, netball_id, hockey_id = first.id, netball.id, hockey.id
+
+        server.init_db()
+        db.session.expire_all()
+
+        assert [s.id for s in server.Student.query.filter_by(email=details['email'])] == [first_id]
+        assert {(r.student_id, r.sport_id) for r in server.StudentSport.query} == {
+            (first_id, netball_id), (first_id, hockey_id)}
+        assert [(w.student_id, w.has_sport) for w in server.Waitlist.query] == [(first_id, True)]
+        assert db.session.get(server.Sport, netball_id).current_count == 1
+        assert db.session.get(server.Sport, hockey_id).current_count == 1
+        applied = db.session.execute(db.select(server.SchemaMigration.version)).scalars().all()
+        assert sorted(applied) == sorted(version for version, _, _ in server.MIGRATIONS)
+
+    assert client.get('/get-all-terms').status_code == 200
+    response = client.post('/submit-form', json={k: details[k] for k in ('email', 'name', 'phone', 'year')})
+    assert (response.status_code, response.get_json()['message']) == (400, 'Already registered this term')
+
+
+def test_migrations_are_a_no_op_on_a_fresh_database(app):
+    with app.app_context():
+        server.db.session.execute(server.db.delete(server.SchemaMigration))
+        server.db.session.commit()
+        server.init_db()
+        assert server.SchemaMigration.query.count() == len(server.MIGRATIONS)
+
+
+class PostgresRecorder:
+    # Compiles each statement for PostgreSQL and reports one duplicate
+    # student, so every statement in the merge runs.
+    dialect = postgresql.dialect()
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, *args):
+        self.statements.append(str(statement.compile(dialect=self.dialect)))
+        return self
+
+    def all(self):
+        return [(2, 1)]
+
+
+def test_duplicate_merge_compiles_for_postgresql():
+    conn = PostgresRecorder()
+    server.add_lookup_indexes(conn)
+    sql = '\n'.join(conn.statements)
+    assert 'has_sport=true' in sql
+    assert 'IS DISTINCT FROM' in sql and ' IS NOT (' not in sql
@@ -0,0 +1,121 @@
+import io
+import threading
+
+import pytest
+
+import app as server
+
+STUDENT = {'email': 'budget@stmarks.nsw.edu.au', 'name': 'Budget Check', 'phone': '0412345678', 'year': '8'}
+UPLOAD = 'email,name,phone,year\nimported@stmarks.nsw.edu.au,Imported Student,0412345678,9\n'
+
+
+def archive_old_term(client, ids):
+    assert client.post(f"/archive-term/{ids['old_term_id']}").status_code == 200
+
+
+def case(rule, budget, method, path, status=200, name=None, setup=None, **kwargs):
+    return pytest.param(rule, budget, method, path, status, setup, kwargs, id=name or rule)
+
+
+# Statements per call with cold caches, counted on the request's own
+# thread. A change that moves a count either way has to update it here.
+CASES = [
+    case('/', 0, 'GET', '/', status=404),
+    case('/<path:path>', 0, 'GET', '/Students/student.html'),
+    case('/get-tenant-config', 0, 'GET', '/get-tenant-config'),
+    case('/get-current-term', 1, 'GET', '/get-current-term'),
+    case('/get-all-terms', 2, 'GET', '/get-all-terms'),
+    case('/create-term', 3, 'POST', '/create-term', json={'term_name': 'Budget Term', 'year': 2030}),
+    case('/set-active-term/<int:term_id>', 6, 'POST', '/set-active-term/{old_term_id}'),
+    case('/archive-term/<int:term_id>', 34, 'POST', '/archive-term/{old_term_id}'),
+    case('/restore-term/<int:term_id>', 9, 'POST', '/restore-term/{old_term_id}', setup=archive_old_term),
+    case('/submit-form', 4, 'POST', '/submit-form', json=STUDENT),
+    case('/get-sports', 2, 'GET', '/get-sports?term_id={term_id}'),
+    case('/submit-sport', 7, 'POST', '/submit-sport', json={'student_id': '{free}', 'sport_id': '{netball}'}),
+    case('/get-all-data', 3, 'GET', '/get-all-data?term_id={term_id}&limit=100'),
+    case('/get-all-data', 3, 'GET', '/get-all-data?term_id={term_id}&limit=100&year=8&sport_id={netball}&search=student',
+         name='/get-all-data (filtered)'),
+    case('/get-sport-registrations/<int:sport_id>', 3, 'GET', '/get-sport-registrations/{netball}'),
+    case('/get-registrations', 2, 'GET', '/get-registrations?term_id={term_id}'),
+    case('/get-term-stats', 2, 'GET', '/get-term-stats?term_id={term_id}'),
+    case('/reconcile-counts', 1, 'POST', '/reconcile-counts?term_id={term_id}'),
+    case('/export', 2, 'GET', '/export?term_id={term_id}'),
+    case('/delete-student/<int:student_id>', 9, 'DELETE', '/delete-student/{hockey_player}'),
+    case('/delete-all-students', 7, 'DELETE', '/delete-all-students?term_id={term_id}'),
+    case('/import-students', 4, 'POST', '/import-students?term_id={term_id}', content_type='multipart/form-data'),
+    case('/add-sport', 5, 'POST', '/add-sport', json={'name': 'Budget Sport', 'capacity': 1, 'term_id': '{term_id}'}),
+    case('/update-sport/<int:sport_id>', 7, 'PUT', '/update-sport/{hockey}', json={'capacity': 2}),
+    case('/delete-sport/<int:sport_id>', 8, 'DELETE', '/delete-sport/{hockey}'),
+    case('/get-system-status', 2, 'GET', '/get-system-status'),
+    case('/set-system-status', 4, 'POST', '/set-system-status', json={'is_open': True}),
+    case('/generate-delete-code', 0, 'GET', '/generate-delete-code'),
+    case('/get-waitlist', 2, 'GET', '/get-waitlist?term_id={term_id}'),
+    case('/add-to-waitlist/<int:student_id>', 5, 'POST', '/add-to-waitlist/{free}', json={'sport_id': '{hockey}'}),
+    case('/metrics', 0, 'GET', '/metrics'),
+    case('/stream', 3, 'GET', '/stream'),
+    case('/live-state', 2, 'GET', '/live-state?term_id={term_id}'),
+]
+
+
+@pytest.fixture
+def ids(client, term_id, register):
+    def add_sport(name, capacity):
+        response = client.post('/add-sport', json={'name': name, 'capacity': capacity, 'term_id': term_id})
+        return response.get_json()['sport_id']
+
+    netball, hockey = add_sport('Netball', 3), add_sport('Hockey', 1)
+    students = [register(client, n) for n in range(4)]
+    client.post('/submit-sport', json={'student_id': students[0], 'sport_id': netball})
+    client.post('/submit-sport', json={'student_id': students[1], 'sport_id': netball})
+    client.post('/submit-sport', json={'student_id': students[2], 'sport_id': hockey})
+    client.post(f'/add-to-waitlist/{students[1]}', json={'sport_id': hockey})
+    old_term_id = client.post('/create-term', json={'term_name': 'Old Term', 'year': 2024}).get_json()['term_id']
+    client.post(f'/set-active-term/{term_id}')
+    return {'term_id': term_id, 'old_term_id': old_term_id, 'netball': netball, 'hockey': hockey,
+            'hockey_player': students[2], 'free': students[3]}
+
+
+def fill(value, ids):
+    if isinstance(value, dict):
+        return {key: fill(item, ids) for key, item in value.items()}
+    if isinstance(value, str) and value.startswith('{') and value.endswith('}'):
+        return ids[value[1:-1]]
+    return value
+
+
+@pytest.mark.parametrize('rule,budget,method,path,status,setup,kwargs', CASES)
+def test_route_query_budget(client, ids, rule, budget, method, path, status, setup, kwargs):
+    if setup:
+        setup(client, ids)
+    kwargs = fill(kwargs, ids)
+    if rule == '/import-students':
+        kwargs['data'] = {'file': (io.BytesIO(UPLOAD.encode()), 'students.csv')}
+    server.term_cache.invalidate()
+    server.term_stats_cache.clear()
+    server.live_updates.snapshots.clear()
+
+    with server.count_queries() as queries:
+        response = client.open(path.format(**ids), method=method, **kwargs)
+        response.close()
+
+    assert response.status_code == status, response.get_data(as_text=True)
+    queries.assert_at_most(budget, rule)
+    assert queries.count == budget, f'{rule} now runs {queries.count} queries; lower its budget to match'
+
+
+def test_every_route_has_a_budget(app):
+    rules = {rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != 'static'}
+    assert rules == {param.values[0] for param in CASES}
+
+
+def test_statements_from_other_threads_are_not_counted(app):
+    def background_query():
+        with app.app_context():
+            server.db.session.execute(server.db.select(server.Term.id)).all()
+
+    with server.count_queries() as own, server.count_queries(all_threads=True) as everyone:
+        thread = threading.Thread(target=background_query)
+        thread.start()
+        thread.join()
+    assert own.count == 0
+    assert everyone.count == 1
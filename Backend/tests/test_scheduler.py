@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta
+
+import app as server
+
+
+def test_app_and_cli_commands_start_no_scheduler(app):
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+    assert server.scheduler.thread is None
+
+
+def test_due_open_is_applied_once(app, client):
+    due = (datetime.now() - timedelta(minutes=1)).isoformat(timespec='minutes')
+    client.post('/set-system-status', json={'is_open': False, 'open_datetime': due})
+
+    with app.app_context():
+        server.run_due_schedules()
+        server.run_due_schedules()
+
+    assert client.get('/get-system-status').get_json() == {'is_open': True, 'open_datetime': '', 'close_datetime': ''}
@@ -0,0 +1,92 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import app as server
+
+
+@pytest.mark.parametrize('write_behind', [False, True])
+def test_concurrent_claims_never_exceed_capacity(make_app, register, write_behind):
+    app = make_app(WRITE_BEHIND=write_behind)
+    admin = app.test_client()
+    term_id = admin.get('/get-current-term').get_json()['term_id']
+    capacity, students = 5, 40
+    sport_id = admin.post('/add-sport', json={'name': 'Netball', 'capacity': capacity, 'term_id': term_id}).get_json()['sport_id']
+    student_ids = [register(admin, n) for n in range(students)]
+
+    # Every thread has its own client and fires at the same moment.
+    barrier = threading.Barrier(students)
+
+    def claim(student_id):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/submit-sport', json={'student_id': student_id, 'sport_id': sport_id})
+        return response.status_code, response.get_json()['message']
+
+    with ThreadPoolExecutor(max_workers=students) as executor:
+        results = list(executor.map(claim, student_ids))
+
+    assert results.count((200, 'Sport submitted')) == capacity
+    assert results.count((400, 'Sport is now full')) == students - capacity
+    with app.app_context():
+        assert server.db.session.get(server.Sport, sport_id).current_count == capacity
+        assert server.StudentSport.query.filter_by(sport_id=sport_id).count() == capacity
+
+
+def test_claim_is_rejected_when_closed_or_repeated(client, term_id, register):
+    open_id = client.post('/add-sport', json={'name': 'Hockey', 'capacity': 2, 'term_id': term_id}).get_json()['sport_id']
+    closed_id = client.post('/add-sport', json={'name': 'Golf', 'capacity': 2, 'term_id': term_id}).get_json()['sport_id']
+    client.put(f'/update-sport/{closed_id}', json={'is_open': False})
+    student_id = register(client, 1)
+
+    response = client.post('/submit-sport', json={'student_id': student_id, 'sport_id': closed_id})
+    assert (response.status_code, response.get_json()['message']) == (400, 'Sport is closed')
+    assert client.post('/submit-sport', json={'student_id': student_id, 'sport_id': open_id}).status_code == 200
+    response = client.post('/submit-sport', json={'student_id': student_id, 'sport_id': open_id})
+    assert (response.status_code, response.get_json()['message']) == (400, 'Already registered for this sport')
+    sports = {s['id']: s for s in client.get(f'/get-sports?term_id={term_id}').get_json()['sports']}
+    assert sports[open_id]['current_count'] == 1
+    assert sports[closed_id]['current_count'] == 0
+
+
+def test_repair_keeps_claims_made_while_it_runs(app, client, term_id, register):
+    netball = client.post('/add-sport', json={'name': 'Netball', 'capacity': 3, 'term_id': term_id}).get_json()['sport_id']
+    hockey = client.post('/add-sport', json={'name': 'Hockey', 'capacity': 5, 'term_id': term_id}).get_json()['sport_id']
+    student_ids = [register(client, n) for n in range(4)]
+    assert client.post('/submit-sport', json={'student_id': student_ids[0], 'sport_id': netball}).status_code == 200
+    with app.app_context():
+        # Only Hockey has drifted.
+        server.db.session.execute(server.db.update(server.Sport).where(server.Sport.id == hockey).values(current_count=3))
+        server.db.session.commit()
+
+    # Another student claims a Netball seat from another thread before each
+    # statement the repair runs, up to and including its first write.
+    request_thread = threading.get_ident()
+    claimants = student_ids[1:]
+    claims = []
+
+    def claim_from_another_thread(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() != request_thread or not claimants or claims[-1:] == ['written']:
+            return
+        student_id = claimants.pop(0)
+        thread = threading.Thread(target=lambda: claims.append(app.test_client().post(
+            '/submit-sport', json={'student_id': student_id, 'sport_id': netball}).status_code))
+        thread.start()
+        thread.join()
+        if not statement.startswith('SELECT'):
+            claims.append('written')
+
+    event.listen(Engine, 'before_cursor_execute', claim_from_another_thread)
+    try:
+        response = client.post(f'/reconcile-counts?term_id={term_id}')
+    finally:
+        event.remove(Engine, 'before_cursor_execute', claim_from_another_thread)
+
+    assert response.get_json()['repaired'] == [{'sport_id': hockey, 'term_id': term_id, 'now': 0}]
+    assert 200 in claims
+    with app.app_context():
+        registered = server.StudentSport.query.filter_by(sport_id=netball).count()
+        assert server.db.session.get(server.Sport, netball).current_count == registered
@@ -0,0 +1,45 @@
+from urllib.parse import urljoin
+
+import app as server
+
+
+def make_tenant_app(make_app, tmp_path):
+    return make_app(TENANTS={'north': {
+        'email_domain': 'north.nsw.edu.au',
+        'year_levels': [11, 12],
+        'database_url': f"sqlite:///{tmp_path / 'north.db'}",
+    }})
+
+
+def test_prefixed_pages_call_their_own_tenant(make_app, tmp_path):
+    client = make_tenant_app(make_app, tmp_path).test_client()
+
+    for page in ('/north/Students/student.html', '/north/Admins/admin.html'):
+        response = client.get(page)
+        assert response.status_code == 200
+        assert 'localhost' not in response.get_data(as_text=True)
+    script = client.get('/north/Admins/script.js').get_data(as_text=True)
+    assert 'localhost' not in script and "'../get-current-term'" in script
+    assert "fetch('../get-tenant-config')" in script
+
+    # The pages' relative API paths resolve under the tenant prefix.
+    assert urljoin('https://sports.example/north/Students/student.html', '../get-tenant-config') == \
+        'https://sports.example/north/get-tenant-config'
+    assert client.get('/north/get-tenant-config').get_json() == {
+        'tenant': 'north', 'email_domain': 'north.nsw.edu.au', 'year_levels': ['11', '12']}
+
+
+def test_registrations_land_in_the_tenant_database(make_app, tmp_path):
+    app = make_tenant_app(make_app, tmp_path)
+    client = app.test_client()
+
+    response = client.post('/north/submit-form', json={
+        'email': 'kim@north.nsw.edu.au', 'name': 'Kim Lee', 'phone': '0412345678', 'year': '11'})
+    assert response.status_code == 200
+    assert client.post('/submit-form', json={
+        'email': 'kim@north.nsw.edu.au', 'name': 'Kim Lee', 'phone': '0412345678', 'year': '11'}).status_code == 400
+
+    with app.app_context():
+        assert server.Student.query.count() == 0
+        with server.use_tenant(server.tenants.by_slug['north']):
+            assert [s.email for s in server.Student.query] == ['kim@north.nsw.edu.au']
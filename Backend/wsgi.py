@@ -0,0 +1,21 @@
+# Production entry point for a pre-fork WSGI server:
+#
+#   flask --app app init-db && flask --app app seed
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# Each worker builds its own app (and its own connection pool, write queue and
+# scheduler thread) after the fork; schema work is left to the commands above.
+# Live updates work across workers: a worker with open /stream connections
+# polls the database for changes made by the others (LIVE_POLL_INTERVAL).
+# Scrape /metrics through the same address as the app: each worker writes its
+# metrics to METRICS_DIR (set by gunicorn.conf.py), and whichever worker takes
+# the scrape reports their sum. Under another server, point every process at
+# one METRICS_DIR, emptied on start; without it each process reports only the
+# requests it served itself.
+# Set SCHEDULER_ENABLED=0 to run the scheduler on its own with
+# `flask --app app run-scheduler` instead.
+from app import create_app, scheduler
+
+app = create_app()
+if app.config['SCHEDULER_ENABLED']:
+    scheduler.start()
@@ -1,19 +1,48 @@
 let allTerms = [];
 let currentTerm = null;
 let allSports = [];
-let allStudents = [];
+let shownStudents = [];
+let studentsCursor = null;
+const STUDENTS_PAGE_SIZE = 100;
 let deleteCodeValue = null;
+const etagCache = {};
+
+// API paths are relative to the page (../get-sports from /Admins/admin.html),
+// so a school served under /<slug>/ talks to its own tenant.
+
+// List endpoints tag responses with the term's data version. Sending the tag
+// back lets the server answer 304 without rebuilding the payload, in which
+// case the previously fetched data is reused.
+function fetchJSON(url) {
+    const cached = etagCache[url];
+    const headers = cached ? {'If-None-Match': cached.etag} : {};
+    return fetch(url, { headers: headers, cache: 'no-store' })
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    etagCache[url] = { etag: etag, data: data };
+                }
+                return data;
+            });
+        });
+}
 
 function switchSection(sectionId) {
     document.querySelectorAll('.section').forEach(s => s.classList.remove('active'));
     document.querySelectorAll('.sidebar-item').forEach(s => s.classList.remove('active'));
     document.getElementById(sectionId).classList.add('active');
     event.target.classList.add('active');
+    if (sectionId === 'registrations') {
+        refreshRegistrations();
+    }
 }
 
 function loadTerms() {
-    fetch('http://localhost:5000/get-all-terms')
-        .then(response => response.json())
+    fetchJSON('../get-all-terms')
         .then(data => {
             allTerms = data.terms;
             displayTerms();
@@ -29,9 +58,43 @@ function displayTerms() {
     allTerms.forEach(term => {
         const option = document.createElement('option');
         option.value = term.id;
-        option.textContent = `${term.term_name} ${term.year}${term.is_active ? ' (Active)' : ''}`;
+        option.textContent = `${term.term_name} ${term.year}${term.is_active ? ' (Active)' : ''}${term.archived ? ' (Archived)' : ''}`;
         select.appendChild(option);
     });
+    
+    const archiveSelect = document.getElementById('archiveTermSelect');
+    archiveSelect.innerHTML = '';
+    allTerms.filter(term => !term.is_active).forEach(term => {
+        const option = document.createElement('option');
+        option.value = term.id;
+        option.textContent = `${term.term_name} ${term.year}${term.archived ? ' (Archived)' : ''}`;
+        archiveSelect.appendChild(option);
+    });
+}
+
+function archiveTerm() {
+    changeArchive('archive-term', 'Term archived');
+}
+
+function restoreTerm() {
+    changeArchive('restore-term', 'Term restored');
+}
+
+function changeArchive(action, successMessage) {
+    const termId = document.getElementById('archiveTermSelect').value;
+    if (!termId) return;
+    
+    fetch(`../${action}/${termId}`, { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                showMessage('archiveMessage', successMessage, 'success');
+                loadTerms();
+            } else {
+                showMessage('archiveMessage', data.message, 'error');
+            }
+        })
+        .catch(error => console.error('Error updating archive:', error));
 }
 
 function populateExportTerms() {
@@ -49,7 +112,7 @@ function populateExportTerms() {
 }
 
 function loadCurrentTerm() {
-    fetch('http://localhost:5000/get-current-term')
+    fetch('../get-current-term')
         .then(response => response.json())
         .then(data => {
             currentTerm = data;
@@ -62,12 +125,15 @@ function loadCurrentTerm() {
 function switchTerm() {
     const termId = document.getElementById('termSelect').value;
     if (termId) {
-        fetch(`http://localhost:5000/set-active-term/${termId}`, {
+        fetch(`../set-active-term/${termId}`, {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
         })
         .then(response => response.json())
         .then(data => {
+            if (data.status !== 'success') {
+                alert(data.message);
+            }
             loadCurrentTerm();
         })
         .catch(error => console.error('Error switching term:', error));
@@ -83,7 +149,7 @@ function createTerm() {
         return;
     }
 
-    fetch('http://localhost:5000/create-term', {
+    fetch('../create-term', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ term_name: termName, year: parseInt(year) })
@@ -107,16 +173,43 @@ function loadAllData() {
 }
 
 function loadSports() {
-    fetch(`http://localhost:5000/get-sports?term_id=${currentTerm.term_id}`)
-        .then(response => response.json())
-        .then(data => {
-            allSports = data.sports;
-            displaySports();
-            displaySportRegistrations();
-        })
+    fetchJSON(`../get-sports?term_id=${currentTerm.term_id}`)
+        .then(applySports)
         .catch(error => console.error('Error loading sports:', error));
 }
 
+// Pushed sport events carry the counts, so the sports list is redrawn from the
+// payload. Rosters and term statistics are whole-term queries, so they are
+// only refetched while the Registrations section is open, and at most once
+// every REGISTRATIONS_REFRESH_MS however fast registrations arrive.
+const REGISTRATIONS_REFRESH_MS = 5000;
+let registrationsRefreshedAt = 0;
+let registrationsRefreshTimer = null;
+
+function applySports(data) {
+    allSports = data.sports;
+    displaySports();
+    refreshRegistrations();
+}
+
+function registrationsVisible() {
+    return document.getElementById('registrations').classList.contains('active');
+}
+
+function refreshRegistrations() {
+    if (!registrationsVisible() || registrationsRefreshTimer) {
+        return;
+    }
+    const wait = registrationsRefreshedAt + REGISTRATIONS_REFRESH_MS - Date.now();
+    registrationsRefreshTimer = setTimeout(() => {
+        registrationsRefreshTimer = null;
+        if (currentTerm && registrationsVisible()) {
+            registrationsRefreshedAt = Date.now();
+            displaySportRegistrations();
+        }
+    }, Math.max(wait, 0));
+}
+
 function displaySports() {
     const sportsList = document.getElementById('sportsList');
     sportsList.innerHTML = '';
@@ -136,41 +229,64 @@ function displaySports() {
     });
 }
 
+function loadTermStats() {
+    fetchJSON(`../get-term-stats?term_id=${currentTerm.term_id}`)
+        .then(stats => {
+            const fillRate = (stats.fill_rate * 100).toFixed(1);
+            const years = stats.years.map(y =>
+                `Year ${y.year}: ${y.registered}/${y.students} registered${y.waitlisted ? `, ${y.waitlisted} waitlisted` : ''}`
+            ).join('<br>');
+            document.getElementById('termStats').innerHTML = `
+                <strong>${stats.filled}/${stats.seats} seats filled (${fillRate}%)</strong><br>
+                ${stats.registered} of ${stats.students} students registered, ${stats.waitlisted} on the waitlist<br>
+                ${years}
+            `;
+        })
+        .catch(error => console.error('Error loading term stats:', error));
+}
+
+function reconcileCounts() {
+    fetch(`../reconcile-counts?term_id=${currentTerm.term_id}`, { method: 'POST' })
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                alert(data.repaired.length ? `Repaired ${data.repaired.length} sport count(s)` : 'All counts are correct');
+                loadSports();
+            }
+        })
+        .catch(error => console.error('Error reconciling counts:', error));
+}
+
 function displaySportRegistrations() {
-    const section = document.getElementById('sportRegistrations');
-    section.innerHTML = '';
-    
-    allSports.forEach(sport => {
-        fetch(`http://localhost:5000/get-sport-registrations/${sport.id}`)
-            .then(response => response.json())
-            .then(data => {
+    loadTermStats();
+    fetchJSON(`../get-registrations?term_id=${currentTerm.term_id}`)
+        .then(data => {
+            const section = document.getElementById('sportRegistrations');
+            section.innerHTML = '';
+            
+            data.sports.forEach(sport => {
                 const div = document.createElement('div');
                 div.className = 'sport-section';
-                div.innerHTML = `<h3>${sport.name} (${data.students.length})</h3>`;
+                div.innerHTML = `<h3>${sport.name} (${sport.students.length})</h3>`;
                 
-                data.students.forEach(student => {
+                sport.students.forEach(student => {
                     const p = document.createElement('p');
                     p.innerHTML = `${student.name} (Yr ${student.year}) - <a href="mailto:${student.email}">${student.email}</a> - ${student.phone}`;
                     div.appendChild(p);
                 });
                 
-                if (data.students.length === 0) {
+                if (sport.students.length === 0) {
                     div.innerHTML += '<p>No registrations</p>';
                 }
                 
                 section.appendChild(div);
             });
-    });
+        })
+        .catch(error => console.error('Error loading registrations:', error));
 }
 
 function loadStudents() {
-    fetch(`http://localhost:5000/get-all-data?term_id=${currentTerm.term_id}`)
-        .then(response => response.json())
-        .then(data => {
-            allStudents = data.students;
-            setupStudentFilterDropdowns();
-        })
-        .catch(error => console.error('Error loading students:', error));
+    setupStudentFilterDropdowns();
 }
 
 function setupStudentFilterDropdowns() {
@@ -199,38 +315,48 @@ function setupStudentFilterDropdowns() {
     applyStudentFilters();
 }
 
-function applyStudentFilters() {
-    const filterTerm = document.getElementById('filterTermSelect').value;
+function studentsPageUrl(cursor) {
+    const params = new URLSearchParams({
+        term_id: document.getElementById('filterTermSelect').value,
+        limit: STUDENTS_PAGE_SIZE
+    });
     const filterYear = document.getElementById('filterYearSelect').value;
     const filterSport = document.getElementById('filterSportSelect').value;
-    
+    const search = document.getElementById('filterSearchInput').value.trim();
+    if (filterYear) params.set('year', filterYear);
+    if (filterSport) params.set('sport_id', filterSport);
+    if (search) params.set('search', search);
+    if (cursor) params.set('after', cursor);
+    return `../get-all-data?${params}`;
+}
+
+function showStudentsPage(data) {
+    shownStudents = shownStudents.concat(data.students || []);
+    studentsCursor = data.next_cursor;
+    document.getElementById('studentsCount').textContent = `Showing ${shownStudents.length} of ${data.total} students`;
+    document.getElementById('loadMoreStudents').style.display = studentsCursor ? 'inline-block' : 'none';
+    displayStudentsTable(shownStudents, document.getElementById('filterSportSelect').value || null);
+}
+
+function applyStudentFilters() {
     const tbody = document.getElementById('studentsTableBody');
     tbody.innerHTML = '';
+    shownStudents = [];
+    studentsCursor = null;
     
-    fetch(`http://localhost:5000/get-all-data?term_id=${filterTerm}`)
-        .then(response => response.json())
-        .then(data => {
-            let students = data.students || [];
-            
-            if (filterYear) {
-                students = students.filter(s => s.year === filterYear);
-            }
-            
-            if (filterSport) {
-                fetch(`http://localhost:5000/get-sport-registrations/${filterSport}`)
-                    .then(r => r.json())
-                    .then(sportData => {
-                        const registeredIds = sportData.students.map(s => s.id);
-                        students = students.filter(s => registeredIds.includes(s.id));
-                        displayStudentsTable(students, filterSport);
-                    });
-            } else {
-                displayStudentsTable(students, null);
-            }
-        })
+    fetchJSON(studentsPageUrl(null))
+        .then(showStudentsPage)
         .catch(error => console.error('Error applying filters:', error));
 }
 
+function loadMoreStudents() {
+    if (!studentsCursor) return;
+    
+    fetchJSON(studentsPageUrl(studentsCursor))
+        .then(showStudentsPage)
+        .catch(error => console.error('Error loading more students:', error));
+}
+
 function displayStudentsTable(students, sportId) {
     const tbody = document.getElementById('studentsTableBody');
     tbody.innerHTML = '';
@@ -242,13 +368,7 @@ function displayStudentsTable(students, sportId) {
         return;
     }
     
-    // Sort by last name alphabetically
-    students.sort((a, b) => {
-        const lastNameA = a.name.split(' ').pop().toLowerCase();
-        const lastNameB = b.name.split(' ').pop().toLowerCase();
-        return lastNameA.localeCompare(lastNameB);
-    });
-    
+    // Pages arrive already sorted by surname, so rows are shown in order.
     students.forEach(student => {
         const row = document.createElement('tr');
         row.style.borderBottom = '1px solid #ecf0f1';
@@ -274,8 +394,7 @@ function displayStudentsTable(students, sportId) {
 }
 
 function loadWaitlist() {
-    fetch(`http://localhost:5000/get-waitlist?term_id=${currentTerm.term_id}`)
-        .then(response => response.json())
+    fetchJSON(`../get-waitlist?term_id=${currentTerm.term_id}`)
         .then(data => {
             const section = document.getElementById('waitlistList');
             section.innerHTML = '';
@@ -288,7 +407,8 @@ function loadWaitlist() {
             data.waitlist.forEach(student => {
                 const p = document.createElement('p');
                 p.className = 'waitlist-item';
-                p.innerHTML = `<span><strong>${student.name}</strong> (Yr ${student.year}) - <a href="mailto:${student.email}">${student.email}</a> - ${student.phone}</span> <button class="btn-delete" onclick="deleteStudent(${student.id})">Delete</button>`;
+                const preferred = student.sport_id ? allSports.find(s => s.id == student.sport_id) : null;
+                p.innerHTML = `<span><strong>${student.name}</strong> (Yr ${student.year})${preferred ? ` - wants ${preferred.name}` : ''} - <a href="mailto:${student.email}">${student.email}</a> - ${student.phone}</span> <button class="btn-delete" onclick="deleteStudent(${student.id})">Delete</button>`;
                 section.appendChild(p);
             });
         })
@@ -305,7 +425,7 @@ function addSport() {
         return;
     }
 
-    fetch('http://localhost:5000/add-sport', {
+    fetch('../add-sport', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ name: name, description: description, capacity: parseInt(capacity), term_id: currentTerm.term_id })
@@ -326,7 +446,7 @@ function addSport() {
 function updateSportCapacity(sportId) {
     const newCapacity = document.getElementById('capacity-' + sportId).value;
 
-    fetch(`http://localhost:5000/update-sport/${sportId}`, {
+    fetch(`../update-sport/${sportId}`, {
         method: 'PUT',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ capacity: parseInt(newCapacity) })
@@ -334,6 +454,9 @@ function updateSportCapacity(sportId) {
     .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
+            if (data.promoted && data.promoted.length) {
+                alert(`${data.promoted.length} waitlisted student(s) moved into the new seat(s)`);
+            }
             loadSports();
         } else {
             alert(data.message);
@@ -348,7 +471,7 @@ function markSportFull(sportId) {
     
     const newCapacity = sport.current_count;
     
-    fetch(`http://localhost:5000/update-sport/${sportId}`, {
+    fetch(`../update-sport/${sportId}`, {
         method: 'PUT',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ capacity: newCapacity })
@@ -366,7 +489,7 @@ function markSportFull(sportId) {
 function deleteSport(sportId) {
     if (!confirm('Delete this sport?')) return;
 
-    fetch(`http://localhost:5000/delete-sport/${sportId}`, {
+    fetch(`../delete-sport/${sportId}`, {
         method: 'DELETE',
     })
     .then(response => response.json())
@@ -381,12 +504,15 @@ function deleteSport(sportId) {
 function deleteStudent(studentId) {
     if (!confirm('Delete this student?')) return;
 
-    fetch(`http://localhost:5000/delete-student/${studentId}`, {
+    fetch(`../delete-student/${studentId}`, {
         method: 'DELETE',
     })
     .then(response => response.json())
     .then(data => {
         if (data.status === 'success') {
+            if (data.promoted && data.promoted.length) {
+                alert(`${data.promoted.length} waitlisted student(s) moved into the freed seat(s)`);
+            }
             loadAllData();
         }
     })
@@ -394,18 +520,21 @@ function deleteStudent(studentId) {
 }
 
 function loadSystemStatus() {
-    fetch('http://localhost:5000/get-system-status')
+    fetch('../get-system-status')
         .then(response => response.json())
-        .then(data => {
-            const statusText = data.is_open ? 'OPEN' : 'CLOSED';
-            const statusClass = data.is_open ? 'status-open' : 'status-closed';
-            document.getElementById('statusText').textContent = statusText;
-            document.getElementById('statusText').className = statusClass;
-            document.getElementById('scheduleText').textContent = data.open_datetime || 'None';
-        })
+        .then(applySystemStatus)
         .catch(error => console.error('Error loading system status:', error));
 }
 
+function applySystemStatus(data) {
+    const statusText = data.is_open ? 'OPEN' : 'CLOSED';
+    const statusClass = data.is_open ? 'status-open' : 'status-closed';
+    document.getElementById('statusText').textContent = statusText;
+    document.getElementById('statusText').className = statusClass;
+    document.getElementById('scheduleText').textContent = data.open_datetime || 'None';
+    document.getElementById('closeScheduleText').textContent = data.close_datetime || 'None';
+}
+
 function scheduleOpen() {
     const date = document.getElementById('openDate').value;
     const time = document.getElementById('openTime').value;
@@ -417,7 +546,7 @@ function scheduleOpen() {
 
     const datetime = `${date}T${time}`;
 
-    fetch('http://localhost:5000/set-system-status', {
+    fetch('../set-system-status', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ is_open: false, open_datetime: datetime })
@@ -434,8 +563,38 @@ function scheduleOpen() {
     .catch(error => console.error('Error scheduling:', error));
 }
 
+function scheduleClose() {
+    const date = document.getElementById('closeDate').value;
+    const time = document.getElementById('closeTime').value;
+    
+    if (!date || !time) {
+        alert('Please select both date and time');
+        return;
+    }
+
+    const datetime = `${date}T${time}`;
+
+    fetch('../set-system-status', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({ close_datetime: datetime })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            showMessage('systemMessage', `Closing scheduled for ${datetime}`, 'success');
+            document.getElementById('closeDate').value = '';
+            document.getElementById('closeTime').value = '';
+            loadSystemStatus();
+        } else {
+            alert(data.message);
+        }
+    })
+    .catch(error => console.error('Error scheduling close:', error));
+}
+
 function openNow() {
-    fetch('http://localhost:5000/set-system-status', {
+    fetch('../set-system-status', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ is_open: true })
@@ -451,7 +610,7 @@ function openNow() {
 }
 
 function closeNow() {
-    fetch('http://localhost:5000/set-system-status', {
+    fetch('../set-system-status', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
         body: JSON.stringify({ is_open: false })
@@ -467,10 +626,10 @@ function closeNow() {
 }
 
 function clearSchedule() {
-    fetch('http://localhost:5000/set-system-status', {
+    fetch('../set-system-status', {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify({ is_open: false, open_datetime: '' })
+        body: JSON.stringify({ is_open: false, open_datetime: '', close_datetime: '' })
     })
     .then(response => response.json())
     .then(data => {
@@ -478,6 +637,8 @@ function clearSchedule() {
             showMessage('systemMessage', 'Schedule cleared!', 'success');
             document.getElementById('openDate').value = '';
             document.getElementById('openTime').value = '';
+            document.getElementById('closeDate').value = '';
+            document.getElementById('closeTime').value = '';
             loadSystemStatus();
         }
     })
@@ -485,7 +646,7 @@ function clearSchedule() {
 }
 
 function startDeleteAll() {
-    fetch('http://localhost:5000/generate-delete-code')
+    fetch('../generate-delete-code')
         .then(response => response.json())
         .then(data => {
             deleteCodeValue = data.code;
@@ -505,7 +666,7 @@ function confirmDeleteAll() {
 
     if (!confirm('Delete ALL students in this term?')) return;
 
-    fetch(`http://localhost:5000/delete-all-students?term_id=${currentTerm.term_id}`, {
+    fetch(`../delete-all-students?term_id=${currentTerm.term_id}`, {
         method: 'DELETE',
     })
     .then(response => response.json())
@@ -526,42 +687,52 @@ function cancelDeleteAll() {
 }
 
 function exportToCSV() {
+    exportData('csv');
+}
+
+function exportToXLSX() {
+    exportData('xlsx');
+}
+
+function exportData(format) {
     const exportTermId = document.getElementById('exportTermSelect').value;
     if (!exportTermId) {
         alert('Please select a term');
         return;
     }
 
-    const selectedTerm = allTerms.find(t => t.id == exportTermId);
+    // The server streams the file, so the browser can download it directly.
+    const link = document.createElement('a');
+    link.setAttribute('href', `../export?term_id=${exportTermId}&format=${format}`);
+    link.click();
+}
 
-    fetch(`http://localhost:5000/get-all-data?term_id=${exportTermId}`)
-        .then(response => response.json())
-        .then(data => {
-            let csvContent = 'data:text/csv;charset=utf-8,';
-            
-            const years = ['7', '8', '9', '10'];
-            years.forEach(year => {
-                csvContent += `\nYear ${year}\n`;
-                csvContent += 'Name,Email,Phone\n';
-                
-                const yearStudents = data.students.filter(s => s.year === year);
-                yearStudents.sort((a, b) => {
-                    const lastNameA = a.name.split(' ').pop();
-                    const lastNameB = b.name.split(' ').pop();
-                    return lastNameA.localeCompare(lastNameB);
-                });
-                
-                yearStudents.forEach(student => {
-                    csvContent += `${student.name},${student.email},${student.phone}\n`;
-                });
-            });
-            
-            const link = document.createElement('a');
-            link.setAttribute('href', encodeURI(csvContent));
-            link.setAttribute('download', `sports_data_${selectedTerm.term_name}_${selectedTerm.year}.csv`);
-            link.click();
-        })
-        .catch(error => console.error('Error exporting:', error));
+function importStudents() {
+    const file = document.getElementById('importFile').files[0];
+    if (!file) {
+        alert('Choose a CSV or JSON file');
+        return;
+    }
+
+    const formData = new FormData();
+    formData.append('file', file);
+
+    fetch(`../import-students?term_id=${currentTerm.term_id}`, {
+        method: 'POST',
+        body: formData
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'success') {
+            const skipped = data.skipped.length ? `, ${data.skipped.length} skipped` : '';
+            showMessage('importMessage', `Imported ${data.imported} students${skipped}`, 'success');
+            document.getElementById('importFile').value = '';
+            loadAllData();
+        } else {
+            showMessage('importMessage', data.message, 'error');
+        }
+    })
+    .catch(error => console.error('Error importing students:', error));
 }
 
 function showMessage(elementId, text, type) {
@@ -573,11 +744,64 @@ function showMessage(elementId, text, type) {
     }, 3000);
 }
 
-setInterval(() => {
-    if (currentTerm) {
-        loadSports();
-        loadSystemStatus();
+// Sport counts and system status are pushed by the server; browsers without
+// EventSource, or turned away when the server is at its stream limit, fall
+// back to polling the cached live state.
+function startLiveUpdates() {
+    if (window.EventSource) {
+        const source = new EventSource('../stream');
+        source.addEventListener('sports', e => {
+            if (currentTerm) {
+                applySports(JSON.parse(e.data));
+            }
+        });
+        source.addEventListener('status', e => applySystemStatus(JSON.parse(e.data)));
+        source.addEventListener('term', () => loadTerms());
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                pollLiveState();
+            }
+        };
+        return;
     }
-}, 2000);
 
-loadTerms();
\ No newline at end of file
+    pollLiveState();
+}
+
+function pollLiveState() {
+    setInterval(() => {
+        if (currentTerm) {
+            fetch(`../live-state?term_id=${currentTerm.term_id}`)
+                .then(response => response.json())
+                .then(data => {
+                    applySports({ sports: data.sports });
+                    applySystemStatus(data.status);
+                })
+                .catch(error => console.error('Error polling live state:', error));
+        }
+    }, 2000);
+}
+
+// Year levels are configured per school, so the year filter is built from the
+// tenant's settings rather than fixed in the page.
+function loadSchoolConfig() {
+    fetch('../get-tenant-config')
+        .then(response => response.json())
+        .then(config => {
+            const filterYearSelect = document.getElementById('filterYearSelect');
+            const picked = filterYearSelect.value;
+            filterYearSelect.innerHTML = '<option value="">All Years</option>';
+            config.year_levels.forEach(year => {
+                const option = document.createElement('option');
+                option.value = year;
+                option.textContent = `Year ${year}`;
+                option.selected = String(year) === picked;
+                filterYearSelect.appendChild(option);
+            });
+        })
+        .catch(error => console.error('Error loading school settings:', error));
+}
+
+loadSchoolConfig();
+loadTerms();
+startLiveUpdates();
\ No newline at end of file